@@ -9,7 +9,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 
 from backend.models.database import get_db_session
-from backend.models.sync_task import get_logs, get_log_stats, SyncLog
+from backend.models.sync_task import get_logs, get_logs_after, get_log_stats, SyncLog
 from backend.utils.auth import require_api_token
 
 router = APIRouter(prefix="/api/logs", tags=["logs"], dependencies=[Depends(require_api_token)])
@@ -47,6 +47,8 @@ def list_logs(
     task_id: Optional[int] = None,
     limit: int = 100,
     offset: int = 0,
+    before_time: Optional[datetime] = None,
+    before_id: Optional[int] = None,
     db: Session = Depends(get_db_session)
 ):
     """
@@ -56,9 +58,14 @@ def list_logs(
         task_id: 任务 ID（可选，不指定则查询所有任务）
         limit: 返回数量限制
         offset: 偏移量（分页）
+        before_time: 游标分页：上一页最后一条的 sync_time（与 before_id 同时提供时忽略 offset）
+        before_id: 游标分页：上一页最后一条的 id
         db: 数据库会话
     """
-    logs = get_logs(db, task_id=task_id, limit=limit, offset=offset)
+    if before_time is not None and before_id is not None:
+        logs = get_logs_after(db, task_id=task_id, cursor=(before_time, before_id), limit=limit)
+    else:
+        logs = get_logs(db, task_id=task_id, limit=limit, offset=offset)
     return [LogResponse.from_orm(log) for log in logs]
 
 
@@ -220,6 +220,7 @@ def create_new_task(task_data: TaskCreate, db: Session = Depends(get_db_session)
         upsert_task_settings(db, task.id, settings_data)
         if mode == 'two_way' and endpoints:
             replace_endpoints(db, task.id, endpoints)
+        task_manager.invalidate(task.id)
         return TaskResponse.from_orm(task)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"创建任务失败: {str(e)}")
@@ -279,6 +280,7 @@ def update_existing_task(
         upsert_task_settings(db, task_id, settings_data)
     if endpoints and mode == 'two_way':
         replace_endpoints(db, task_id, endpoints)
+    task_manager.invalidate(task_id)
     
     return TaskResponse.from_orm(updated_task)
 
@@ -291,6 +293,7 @@ def delete_existing_task(task_id: int, db: Session = Depends(get_db_session)):
         task_manager.stop_task(task_id)
     
     success = delete_task(db, task_id)
+    task_manager.invalidate(task_id)
     if not success:
         raise HTTPException(status_code=404, detail="任务不存在")
     
@@ -15,6 +15,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from backend.config.settings import load_config
 from backend.models.database import init_database
 from backend.core.task_manager import task_manager
+from backend.core.ssh_pool import ssh_pool
 from backend.utils.logger import setup_logger, logger
 from backend.api import tasks, logs, config, ws
 from backend.utils.realtime import ws_hub
@@ -52,6 +53,9 @@ async def lifespan(app: FastAPI):
         # 关闭时执行（确保 Ctrl+C / CancelledError 也能清理后台线程）
         logger.info("文件同步助手关闭中...")
         task_manager.stop_all()
+        # 任务停止后仍在池中的连接（如未正常释放的）一并关闭
+        ssh_pool.close_all()
+        ws_hub.close()
         logger.info("✓ 文件同步助手已关闭")
 
 
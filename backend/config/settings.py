@@ -41,6 +41,8 @@ class GlobalConfig(BaseModel):
     api_token: Optional[str] = None
     ssh_host_key_policy: Literal['auto', 'reject', 'warning'] = 'reject'
     ssh_known_hosts_path: str = './data/known_hosts'
+    # 单文件限速：同一文件两次同步的最小间隔（秒），期间的重复事件合并延后
+    sync_min_interval: float = Field(default=1.0, ge=0)
 
 
 class AppConfig(BaseModel):
@@ -5,14 +5,14 @@ import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from backend.core.file_watcher import FileWatcher
-from backend.core.eol_normalizer import TEXT_EXTENSIONS
+from backend.core.eol_normalizer import TEXT_EXTENSIONS, normalize_bytes
 from backend.models.database import get_db
 from backend.models.sync_task import create_log
-from backend.models.sync_state import get_all_file_states, upsert_file_state
-from backend.utils.file_utils import should_exclude, should_include_extension, ensure_parent_dir
+from backend.models.sync_state import get_all_file_states, bulk_upsert_file_states
+from backend.utils.file_utils import compile_excluder, make_ext_filter, should_exclude, ensure_parent_dir
 from backend.utils.logger import logger
 
 # 尝试导入远程 inotify 模块
@@ -23,16 +23,6 @@ except ImportError:
     INOTIFY_AVAILABLE = False
 
 
-def _normalize_bytes(content: bytes, target: str) -> bytes:
-    if target == 'keep':
-        return content
-    normalized = content.replace(b'\r\n', b'\n')
-    normalized = normalized.replace(b'\r', b'\n')
-    if target == 'crlf':
-        normalized = normalized.replace(b'\n', b'\r\n')
-    return normalized
-
-
 def _is_text_path(rel_path: str) -> bool:
     path = Path(rel_path)
     ext = path.suffix.lower()
@@ -48,7 +38,9 @@ class LocalEndpoint:
         self.type = 'local'
         self.root = Path(root)
         self.exclude_patterns = list(exclude_patterns or [])
+        self._excluder = compile_excluder(self.exclude_patterns)
         self.file_extensions = list(file_extensions or [])
+        self._ext_filter = make_ext_filter(self.file_extensions)
         self.trash_dir = trash_dir
         self.backup_dir = backup_dir
         self._internal_dirs = {trash_dir, backup_dir}
@@ -58,7 +50,7 @@ class LocalEndpoint:
         if any(p in self._internal_dirs for p in parts):
             return True
         rel_os = rel_path.replace('/', os.sep)
-        return should_exclude(rel_os, self.exclude_patterns)
+        return should_exclude(rel_os, self._excluder)
 
     def _abs_path(self, rel_path: str) -> Path:
         return self.root / Path(rel_path)
@@ -81,7 +73,7 @@ class LocalEndpoint:
                 rel_path = f"{rel_root_str}/{filename}" if rel_root_str else filename
                 if self._is_excluded(rel_path):
                     continue
-                if not should_include_extension(rel_path, self.file_extensions):
+                if not self._ext_filter(rel_path):
                     continue
                 meta = self.get_meta(rel_path)
                 if meta:
@@ -165,7 +157,9 @@ class SshEndpoint:
         self.transfer = transfer
         self.root = root.rstrip('/')
         self.exclude_patterns = list(exclude_patterns or [])
+        self._excluder = compile_excluder(self.exclude_patterns)
         self.file_extensions = list(file_extensions or [])
+        self._ext_filter = make_ext_filter(self.file_extensions)
         self.trash_dir = trash_dir
         self.backup_dir = backup_dir
         self._internal_dirs = {trash_dir, backup_dir}
@@ -175,7 +169,7 @@ class SshEndpoint:
         if any(p in self._internal_dirs for p in parts):
             return True
         rel_os = rel_path.replace('/', os.sep)
-        return should_exclude(rel_os, self.exclude_patterns)
+        return should_exclude(rel_os, self._excluder)
 
     def _remote_path(self, rel_path: str) -> str:
         rel_posix = rel_path.replace('\\', '/')
@@ -198,10 +192,10 @@ class SshEndpoint:
         """
         遍历远端文件并按需过滤（流式），避免轮询时长时间阻塞在一次性全量 list_files 上。
         """
-        for rel_path, attr in self.transfer.iter_files(self.root):
+        for rel_path, attr in self.transfer.iter_files_fast(self.root):
             if self._is_excluded(rel_path):
                 continue
-            if not should_include_extension(rel_path, self.file_extensions):
+            if not self._ext_filter(rel_path):
                 continue
             yield rel_path, {'size': attr.st_size, 'mtime': attr.st_mtime}
 
@@ -282,6 +276,9 @@ class SshEndpoint:
 
 
 class BidirectionalTaskRunner:
+    # 首次基线同步时每批写库的文件数
+    STATE_BATCH_SIZE = 500
+
     def __init__(self, task, endpoints: Dict[str, Dict], settings):
         self.task_id = task.id
         self.task_name = task.name
@@ -388,18 +385,29 @@ class BidirectionalTaskRunner:
             'last_sync_at': row.last_sync_at
         }
 
+    @staticmethod
+    def _state_row(rel_path: str, state: Dict) -> Dict:
+        return {
+            'rel_path': rel_path,
+            'a_meta': state.get('a_meta') or {},
+            'b_meta': state.get('b_meta') or {},
+            'a_deleted': state.get('a_deleted', False),
+            'b_deleted': state.get('b_deleted', False),
+            'a_seen_at': state.get('a_seen_at'),
+            'b_seen_at': state.get('b_seen_at'),
+            'last_winner': state.get('last_winner'),
+            'last_sync_at': state.get('last_sync_at')
+        }
+
     def _save_state(self, rel_path: str, state: Dict):
+        self._save_states([self._state_row(rel_path, state)])
+
+    def _save_states(self, rows: List[Dict]):
+        """批量落库（一条 upsert 语句 + 一次提交）"""
+        if not rows:
+            return
         with get_db() as db:
-            upsert_file_state(db, self.task_id, rel_path, {
-                'a_meta': state.get('a_meta') or {},
-                'b_meta': state.get('b_meta') or {},
-                'a_deleted': state.get('a_deleted', False),
-                'b_deleted': state.get('b_deleted', False),
-                'a_seen_at': state.get('a_seen_at'),
-                'b_seen_at': state.get('b_seen_at'),
-                'last_winner': state.get('last_winner'),
-                'last_sync_at': state.get('last_sync_at')
-            })
+            bulk_upsert_file_states(db, self.task_id, rows)
 
     def start(self):
         if self.is_running:
@@ -788,12 +796,12 @@ class BidirectionalTaskRunner:
                 if self.eol_normalize == 'keep' or not _is_text_path(rel_path):
                     return self._hash_file(abs_path)
                 content = abs_path.read_bytes()
-                content = _normalize_bytes(content, self.eol_normalize)
+                content = normalize_bytes(content, self.eol_normalize)
                 return hashlib.new(self._hash_algo, content).hexdigest()
             else:
                 content = endpoint.read_bytes(rel_path)
                 if self.eol_normalize != 'keep' and _is_text_path(rel_path):
-                    content = _normalize_bytes(content, self.eol_normalize)
+                    content = normalize_bytes(content, self.eol_normalize)
                 return hashlib.new(self._hash_algo, content).hexdigest()
         except Exception:
             return None
@@ -809,7 +817,7 @@ class BidirectionalTaskRunner:
         """
         批量同步处理线程：收集短时间内的事件，然后批量执行同步
         """
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from concurrent.futures import ThreadPoolExecutor
         
         while not self._stop_event.is_set():
             # 等待有新事件或超时
@@ -850,22 +858,26 @@ class BidirectionalTaskRunner:
                 start_time = time.time()
                 
                 # 并行执行同步（限制并发数）
+                # 完成计数在工作线程的回调里累加，驱动线程只在整批结束（退出 with 时 shutdown 等待）时唤醒一次
+                counts = {'completed': 0, 'failed': 0}
+                counts_lock = threading.Lock()
+
+                def _on_done(future, task):
+                    error = future.exception()
+                    with counts_lock:
+                        if error is None:
+                            counts['completed'] += 1
+                        else:
+                            counts['failed'] += 1
+                    if error is not None:
+                        logger.error(f"批量同步失败: {task['rel_path']} - {error}")
+
                 with ThreadPoolExecutor(max_workers=self._batch_max_parallel) as executor:
-                    futures = {
-                        executor.submit(self._sync_side, task['winner'], task['loser'], task['rel_path']): task
-                        for task in sync_tasks
-                    }
-                    
-                    completed = 0
-                    failed = 0
-                    for future in as_completed(futures):
-                        try:
-                            future.result()
-                            completed += 1
-                        except Exception as e:
-                            failed += 1
-                            task = futures[future]
-                            logger.error(f"批量同步失败: {task['rel_path']} - {e}")
+                    for task in sync_tasks:
+                        future = executor.submit(self._sync_side, task['winner'], task['loser'], task['rel_path'])
+                        future.add_done_callback(lambda f, task=task: _on_done(f, task))
+                completed = counts['completed']
+                failed = counts['failed']
                 
                 elapsed = time.time() - start_time
                 logger.info(f"批量同步完成: 成功 {completed}, 失败 {failed}, 耗时 {elapsed:.2f}s")
@@ -997,7 +1009,7 @@ class BidirectionalTaskRunner:
                 dst_ep.copy_file(src_abs, rel_path)
             else:
                 content = src_ep.read_bytes(rel_path)
-                content = _normalize_bytes(content, self.eol_normalize)
+                content = normalize_bytes(content, self.eol_normalize)
                 dst_ep.write_bytes(rel_path, content)
             return
 
@@ -1007,7 +1019,7 @@ class BidirectionalTaskRunner:
                 dst_ep.upload_file(src_abs, rel_path)
             else:
                 content = src_ep.read_bytes(rel_path)
-                content = _normalize_bytes(content, self.eol_normalize)
+                content = normalize_bytes(content, self.eol_normalize)
                 dst_ep.write_bytes(rel_path, content)
             return
 
@@ -1018,14 +1030,14 @@ class BidirectionalTaskRunner:
                 src_ep.download_file(rel_path, dest_abs)
             else:
                 content = src_ep.read_bytes(rel_path)
-                content = _normalize_bytes(content, self.eol_normalize)
+                content = normalize_bytes(content, self.eol_normalize)
                 dst_ep.write_bytes(rel_path, content)
             return
 
         if src_ep.type == 'ssh' and dst_ep.type == 'ssh':
             content = src_ep.read_bytes(rel_path)
             if self.eol_normalize != 'keep' and _is_text_path(rel_path):
-                content = _normalize_bytes(content, self.eol_normalize)
+                content = normalize_bytes(content, self.eol_normalize)
             dst_ep.write_bytes(rel_path, content)
 
     def _initial_sync(self, stats: Optional[Dict] = None):
@@ -1038,9 +1050,14 @@ class BidirectionalTaskRunner:
         now = datetime.now()
 
         all_paths = set(a_files.keys()) | set(b_files.keys())
+        # 两端都已存在的文件只需记录基线，攒批写库，避免每个文件一次事务
+        baseline_paths = []
         for rel_path in all_paths:
             if self._stop_event.is_set():
-                return
+                break
+            if len(baseline_paths) >= self.STATE_BATCH_SIZE:
+                self._flush_baseline(baseline_paths)
+                baseline_paths = []
             a_meta = a_files.get(rel_path)
             b_meta = b_files.get(rel_path)
             if a_meta and not b_meta:
@@ -1088,7 +1105,14 @@ class BidirectionalTaskRunner:
                 }
                 with self._lock:
                     self._state_cache[rel_path] = state
-                    self._save_state(rel_path, state)
+                baseline_paths.append(rel_path)
+        self._flush_baseline(baseline_paths)
+
+    def _flush_baseline(self, rel_paths: List[str]):
+        # 持锁按缓存中的最新状态落库：期间若有事件更新了某个文件，写入的是更新后的状态
+        with self._lock:
+            rows = [self._state_row(p, self._state_cache[p]) for p in rel_paths if p in self._state_cache]
+            self._save_states(rows)
 
     def sync_all(self, force: bool = False) -> dict:
         stats = {'synced': 0, 'skipped': 0, 'failed': 0}
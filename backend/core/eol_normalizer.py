@@ -7,6 +7,7 @@
 3. 计算文件哈希（统一换行符后）
 """
 
+import hashlib
 import os
 from pathlib import Path
 from typing import Literal
@@ -41,6 +42,9 @@ BINARY_EXTENSIONS = {
 
 EOLType = Literal['lf', 'crlf', 'keep']
 
+# 原始哈希的分块读取大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
 
 def is_text_file(file_path: str | Path) -> bool:
     """
@@ -115,6 +119,50 @@ def detect_line_ending(file_path: str | Path) -> str:
         return 'unknown'
 
 
+def normalize_bytes(content: bytes, target: EOLType = 'lf') -> bytes:
+    """
+    统一字节内容的换行符
+    
+    Args:
+        content: 原始内容
+        target: 目标换行符类型 ('lf', 'crlf', 'keep')
+        
+    Returns:
+        转换后的内容；不含 CR 且目标为 LF 时原样返回，不产生拷贝
+    """
+    if target == 'keep':
+        return content
+    if b'\r' in content:
+        # 1. 先将所有 CRLF 转为 LF
+        content = content.replace(b'\r\n', b'\n')
+        # 2. 将所有单独的 CR 转为 LF
+        content = content.replace(b'\r', b'\n')
+    # 3. 根据目标类型转换
+    if target == 'crlf':
+        content = content.replace(b'\n', b'\r\n')
+    # target == 'lf' 时已经是 LF，无需额外处理
+    return content
+
+
+def hash_bytes_normalized(
+    data: bytes,
+    eol_mode: EOLType = 'lf',
+    hash_algorithm: str = 'md5'
+) -> str:
+    """
+    计算字节内容统一换行符后的哈希值（不做文本/二进制判断，由调用方决定）
+    
+    Args:
+        data: 原始内容
+        eol_mode: 换行符统一模式（'lf', 'crlf', 'keep'）
+        hash_algorithm: 哈希算法（'md5', 'sha256'）
+        
+    Returns:
+        哈希值（十六进制字符串）
+    """
+    return hashlib.new(hash_algorithm, normalize_bytes(data, eol_mode)).hexdigest()
+
+
 def normalize_line_endings(
     file_path: str | Path,
     target: EOLType = 'lf',
@@ -149,16 +197,7 @@ def normalize_line_endings(
     except Exception as e:
         raise IOError(f"读取文件失败: {e}")
     
-    # 统一换行符
-    # 1. 先将所有 CRLF 转为 LF
-    normalized = content.replace(b'\r\n', b'\n')
-    # 2. 将所有单独的 CR 转为 LF
-    normalized = normalized.replace(b'\r', b'\n')
-    
-    # 3. 根据目标类型转换
-    if target == 'crlf':
-        normalized = normalized.replace(b'\n', b'\r\n')
-    # target == 'lf' 时已经是 LF，无需额外处理
+    normalized = normalize_bytes(content, target)
     
     # 写回文件或返回内容
     if in_place:
@@ -191,23 +230,25 @@ def calculate_file_hash_normalized(
     Returns:
         哈希值（十六进制字符串）
     """
-    import hashlib
-    
     file_path = Path(file_path)
     
     # 如果不是文本文件或 keep 模式，直接计算原始哈希
     if eol_mode == 'keep' or not is_text_file(file_path):
         hasher = hashlib.new(hash_algorithm)
+        buf = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buf)
         with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                hasher.update(chunk)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                hasher.update(view[:n])
         return hasher.hexdigest()
     
     # 文本文件：统一换行符后计算哈希
-    normalized_content = normalize_line_endings(file_path, target=eol_mode, in_place=False)
-    hasher = hashlib.new(hash_algorithm)
-    hasher.update(normalized_content)
-    return hasher.hexdigest()
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    return hash_bytes_normalized(content, eol_mode, hash_algorithm)
 
 
 if __name__ == '__main__':
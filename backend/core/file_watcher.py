@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Callable, List
 from watchdog.observers import Observer
 from watchdog.events import (
+    EVENT_TYPE_MOVED,
     FileSystemEventHandler,
     FileSystemEvent,
     FileCreatedEvent,
@@ -15,7 +16,12 @@ from watchdog.events import (
 )
 
 from backend.utils.logger import logger
-from backend.utils.file_utils import should_exclude, should_include_extension
+from backend.utils.file_utils import compile_excluder, make_ext_filter, should_exclude
+
+
+# 只订阅文件级的增/改/删/移事件：inotify 按此生成监听掩码，
+# 目录事件与 open/close 等事件在内核/emitter 层即被丢弃，不再进入 Python 回调
+WATCHED_EVENT_TYPES = [FileCreatedEvent, FileModifiedEvent, FileDeletedEvent, FileMovedEvent]
 
 
 class SyncEventHandler(FileSystemEventHandler):
@@ -40,22 +46,32 @@ class SyncEventHandler(FileSystemEventHandler):
         super().__init__()
         self.on_change = on_change
         self.exclude_patterns = exclude_patterns or []
+        self._excluder = compile_excluder(self.exclude_patterns)
         self.file_extensions = file_extensions or []
+        self._ext_filter = make_ext_filter(self.file_extensions)
         self.base_path = Path(base_path) if base_path else None
         
-    def _should_process(self, file_path: str) -> bool:
-        """检查文件是否应该处理"""
-        # 忽略目录事件（只处理文件）
-        if Path(file_path).is_dir():
-            return False
+    def dispatch(self, event: FileSystemEvent) -> None:
+        """
+        分发前统一过滤：目录事件、被排除路径直接丢弃
         
+        移动事件需要同时看源/目标路径，交给 on_moved 判断。
+        """
+        if event.is_directory:
+            return
+        if event.event_type != EVENT_TYPE_MOVED and should_exclude(event.src_path, self._excluder):
+            return
+        super().dispatch(event)
+    
+    def _should_process(self, file_path: str) -> bool:
+        """检查文件是否应该处理（目录事件已由 dispatch 过滤，无需再 stat）"""
         # 检查排除规则
-        if should_exclude(file_path, self.exclude_patterns):
+        if should_exclude(file_path, self._excluder):
             logger.debug(f"文件被排除规则过滤: {file_path}")
             return False
         
         # 检查扩展名
-        if not should_include_extension(file_path, self.file_extensions):
+        if not self._ext_filter(file_path):
             logger.debug(f"文件扩展名不匹配: {file_path}")
             return False
         
@@ -94,7 +110,7 @@ class SyncEventHandler(FileSystemEventHandler):
             return
         
         # 检查源文件和目标文件
-        src_should_process = should_exclude(event.src_path, self.exclude_patterns) == False
+        src_should_process = should_exclude(event.src_path, self._excluder) == False
         dest_should_process = self._should_process(event.dest_path)
         
         if src_should_process or dest_should_process:
@@ -147,7 +163,8 @@ class FileWatcher:
         self.observer.schedule(
             self.event_handler,
             str(self.watch_path),
-            recursive=True
+            recursive=True,
+            event_filter=WATCHED_EVENT_TYPES
         )
         self.observer.start()
         self.is_running = True
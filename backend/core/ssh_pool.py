@@ -0,0 +1,137 @@
+"""
+文件同步助手 - SSH 连接池
+
+同一进程内，连接参数相同的 SSHTransfer 共用一个 SSHClient（一条 TCP + 一次认证），
+各自在其上打开独立的 SFTP 通道。避免多任务同时连接同一主机时触发 sshd 的 MaxStartups 限流。
+单条连接上的通道数受 sshd MaxSessions（默认 10）限制，超出时为同一键再建一条连接；
+分配给 SFTP 的通道留出余量，供 exec 命令（find/tar/mkdir/rm 及探测）使用。
+"""
+
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from paramiko import SSHClient
+
+from backend.utils.logger import logger
+
+
+PoolKey = Tuple
+
+
+def make_pool_key(host: str, port: int, username: str, password: Optional[str] = None,
+                  key_filename: Optional[str] = None, host_key_policy: Optional[str] = None,
+                  known_hosts_path: Optional[str] = None) -> PoolKey:
+    """
+    生成连接池键：认证信息不同的连接不共用（密码只保留摘要）
+    """
+    password_digest = hashlib.sha256(password.encode('utf-8')).hexdigest() if password else None
+    return (host, int(port), username, password_digest, key_filename, host_key_policy, known_hosts_path)
+
+
+def _is_active(client: SSHClient) -> bool:
+    try:
+        transport = client.get_transport()
+        return bool(transport and transport.is_active())
+    except Exception:
+        return False
+
+
+class _Entry:
+    __slots__ = ('client', 'refcount', 'channels')
+
+    def __init__(self, client: SSHClient):
+        self.client = client
+        self.refcount = 0
+        # 各持有者声明要在这条连接上打开的通道数之和
+        self.channels = 0
+
+
+class SSHClientPool:
+    """按连接参数复用 SSHClient 的引用计数池"""
+
+    # 每条连接最多分配给 SFTP 的通道数：sshd 默认 MaxSessions=10，留 2 个会话给 exec 命令
+    MAX_CHANNELS_PER_CLIENT = 8
+
+    def __init__(self):
+        self._entries: Dict[PoolKey, List[_Entry]] = {}
+        self._key_locks: Dict[PoolKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: PoolKey) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def acquire(self, key: PoolKey, factory: Callable[[], SSHClient], channels: int = 1) -> SSHClient:
+        """
+        获取一个已连接的 SSHClient，不存在、已断开或通道已满时调用 factory 新建
+
+        同一键的建连串行进行，不同主机之间互不阻塞。
+
+        Args:
+            channels: 调用方要在该连接上打开的通道数（释放时需传入相同的值）
+        """
+        with self._key_lock(key):
+            with self._lock:
+                entries = self._entries.get(key, [])
+                # 已断开的连接移出池，由仍持有它的调用方各自释放
+                entries[:] = [e for e in entries if _is_active(e.client)]
+                for entry in entries:
+                    if entry.channels + channels <= self.MAX_CHANNELS_PER_CLIENT:
+                        entry.refcount += 1
+                        entry.channels += channels
+                        return entry.client
+
+            client = factory()
+            with self._lock:
+                entry = _Entry(client)
+                entry.refcount = 1
+                entry.channels = channels
+                self._entries.setdefault(key, []).append(entry)
+            return client
+
+    def release(self, key: PoolKey, client: SSHClient, channels: int = 1, discard: bool = False) -> None:
+        """
+        归还 SSHClient；引用计数归零时关闭连接
+
+        Args:
+            channels: acquire 时声明的通道数
+            discard: 调用方遇到了错误；仅当连接确实已断开时才移出池并关闭，
+                     否则只减引用计数，不影响共用这条连接的其他调用方
+        """
+        close = False
+        with self._lock:
+            entries = self._entries.get(key, [])
+            entry = next((e for e in entries if e.client is client), None)
+            if entry is not None:
+                entry.refcount -= 1
+                entry.channels -= channels
+                if entry.refcount <= 0 or (discard and not _is_active(client)):
+                    entries.remove(entry)
+                    if not entries:
+                        del self._entries[key]
+                    close = True
+            else:
+                # 已被移出池的旧连接
+                close = True
+        if close:
+            try:
+                client.close()
+                logger.info("SSH 连接已关闭")
+            except Exception as e:
+                logger.debug(f"SSH 连接关闭失败: {e}")
+
+    def close_all(self) -> None:
+        """关闭池中所有连接（应用关闭时由 lifespan 在停止全部任务后调用）"""
+        with self._lock:
+            entries = [e for group in self._entries.values() for e in group]
+            self._entries.clear()
+        for entry in entries:
+            try:
+                entry.client.close()
+            except Exception as e:
+                logger.debug(f"SSH 连接关闭失败: {e}")
+
+
+# 全局连接池实例
+ssh_pool = SSHClientPool()
@@ -13,6 +13,7 @@ from typing import Optional, Dict, Any, Callable
 from backend.core.file_watcher import FileWatcher
 from backend.core.eol_normalizer import normalize_line_endings, is_text_file
 from backend.utils.logger import logger
+from backend.utils.file_utils import compile_excluder, make_ext_filter
 
 
 class BaseSyncEngine(ABC):
@@ -36,7 +37,9 @@ class BaseSyncEngine(ABC):
         self.target_config = task_config['target']
         self.eol_normalize = task_config.get('eol_normalize', 'lf')
         self.exclude_patterns = task_config.get('exclude_patterns', [])
+        self._excluder = compile_excluder(self.exclude_patterns)
         self.file_extensions = task_config.get('file_extensions', [])
+        self._ext_filter = make_ext_filter(self.file_extensions)
         self._stop_event = threading.Event()
         
         self.watcher: Optional[FileWatcher] = None
@@ -232,7 +235,7 @@ class LocalSyncEngine(BaseSyncEngine):
         
         遍历源目录下的所有文件，逐一同步到目标目录
         """
-        from backend.utils.file_utils import should_exclude, should_include_extension
+        from backend.utils.file_utils import should_exclude
         
         stats = {'synced': 0, 'skipped': 0, 'failed': 0}
         
@@ -245,7 +248,7 @@ class LocalSyncEngine(BaseSyncEngine):
                 stats['aborted'] = True
                 break
             # 过滤目录
-            dirs[:] = [d for d in dirs if not should_exclude(Path(root) / d, self.exclude_patterns)]
+            dirs[:] = [d for d in dirs if not should_exclude(Path(root) / d, self._excluder)]
             
             for filename in files:
                 if self.should_stop():
@@ -256,12 +259,12 @@ class LocalSyncEngine(BaseSyncEngine):
                 rel_path = src_file.relative_to(self.source_path)
                 
                 # 检查排除规则
-                if should_exclude(rel_path, self.exclude_patterns):
+                if should_exclude(rel_path, self._excluder):
                     stats['skipped'] += 1
                     continue
                 
                 # 检查文件扩展名
-                if not should_include_extension(src_file, self.file_extensions):
+                if not self._ext_filter(src_file):
                     stats['skipped'] += 1
                     continue
                 
@@ -415,13 +418,84 @@ class SshSyncEngine(BaseSyncEngine):
             
         logger.info(f"✓ 远程同步成功: {os.path.basename(remote_path)}")
 
+    # 全量同步时文件数不少于该值才走 tar 批量上传；每批文件数上限（失败时回退范围）
+    BULK_MIN_FILES = 16
+    BULK_BATCH_FILES = 500
+
+    def _normalized_content(self, src: str) -> Optional[bytes]:
+        """需要统一换行符的文本文件返回转换后的内容，否则返回 None（按原文件上传）"""
+        src_path = Path(src)
+        if self.eol_normalize != 'keep' and is_text_file(src_path):
+            return normalize_line_endings(src_path, target=self.eol_normalize, in_place=False)
+        return None
+
+    def _upload_one(self, rel_path: Path, src_file: Path, stats: dict, callback) -> None:
+        remote_rel_path = str(rel_path).replace('\\', '/')
+        remote_target = f"{self.remote_root.rstrip('/')}/{remote_rel_path}"
+        try:
+            self._handle_upload(str(src_file), remote_target)
+            stats['synced'] += 1
+            if callback:
+                callback('success', str(rel_path), str(src_file), None)
+        except Exception as e:
+            logger.error(f"远程同步失败: {rel_path} - {e}")
+            stats['failed'] += 1
+            try:
+                self.transfer.ensure_connected()
+            except Exception:
+                pass
+            if callback:
+                callback('failed', str(rel_path), str(src_file), str(e))
+
+    def _ensure_remote_dirs(self, pending: list) -> None:
+        """逐个上传前一次性建好所有目标目录（合并为一条 mkdir -p）"""
+        root = self.remote_root.rstrip('/')
+        dirs = {root}
+        for rel_path, _ in pending:
+            parent = str(rel_path.parent).replace('\\', '/')
+            if parent != '.':
+                dirs.add(f"{root}/{parent}")
+        try:
+            self.transfer.mkdir_many(dirs)
+        except Exception as e:
+            # 目录创建失败时由逐个上传各自重试并记录错误
+            logger.warning(f"[{self.name}] 预创建远程目录失败: {e}")
+
+    def _bulk_upload(self, pending: list, stats: dict, callback) -> None:
+        """按批 tar 上传；某批失败时该批回退为逐个 SFTP 上传"""
+        for i in range(0, len(pending), self.BULK_BATCH_FILES):
+            if self.should_stop():
+                logger.info(f"[{self.name}] 同步已取消")
+                stats['aborted'] = True
+                return
+            batch = pending[i:i + self.BULK_BATCH_FILES]
+            try:
+                self.transfer.bulk_upload(
+                    self.remote_root,
+                    [(str(rel_path), str(src_file)) for rel_path, src_file in batch],
+                    content_fn=self._normalized_content
+                )
+            except Exception as e:
+                logger.warning(f"[{self.name}] 批量上传失败，改为逐个上传: {e}")
+                for rel_path, src_file in batch:
+                    if self.should_stop():
+                        stats['aborted'] = True
+                        return
+                    self._upload_one(rel_path, src_file, stats, callback)
+                continue
+            stats['synced'] += len(batch)
+            logger.info(f"✓ 批量上传成功: {len(batch)} 个文件")
+            if callback:
+                for rel_path, src_file in batch:
+                    callback('success', str(rel_path), str(src_file), None)
+
     def sync_all(self, force: bool = False, callback: Optional[Callable[[str, str, str, Optional[str]], None]] = None) -> dict:
         """
         执行全量同步（SSH远程）
         
-        遍历源目录下的所有文件，逐一上传到远程服务器
+        遍历源目录下的所有文件上传到远程服务器；文件较多且远端有 tar 时整批打包上传。
         """
-        from backend.utils.file_utils import should_exclude, should_include_extension
+        from backend.utils.file_utils import should_exclude
         
         stats = {'synced': 0, 'skipped': 0, 'failed': 0}
         
@@ -429,52 +503,44 @@ class SshSyncEngine(BaseSyncEngine):
         if self.transfer:
             self.transfer.ensure_connected()
         
-        # 遍历源目录所有文件
+        # 遍历源目录，收集待上传文件
+        pending = []
         for root, dirs, files in os.walk(self.source_path):
             if self.should_stop():
                 logger.info(f"[{self.name}] 同步已取消")
                 stats['aborted'] = True
                 break
             # 过滤目录
-            dirs[:] = [d for d in dirs if not should_exclude(Path(root) / d, self.exclude_patterns)]
+            dirs[:] = [d for d in dirs if not should_exclude(Path(root) / d, self._excluder)]
             
             for filename in files:
-                if self.should_stop():
-                    logger.info(f"[{self.name}] 同步已取消")
-                    stats['aborted'] = True
-                    break
                 src_file = Path(root) / filename
                 rel_path = src_file.relative_to(self.source_path)
                 
                 # 检查排除规则
-                if should_exclude(rel_path, self.exclude_patterns):
+                if should_exclude(rel_path, self._excluder):
                     stats['skipped'] += 1
                     continue
                 
                 # 检查文件扩展名
-                if not should_include_extension(src_file, self.file_extensions):
+                if not self._ext_filter(src_file):
                     stats['skipped'] += 1
                     continue
                 
-                # 构造远程路径
-                remote_rel_path = str(rel_path).replace('\\', '/')
-                remote_target = f"{self.remote_root.rstrip('/')}/{remote_rel_path}"
-                
-                # 同步文件
-                try:
-                    self._handle_upload(str(src_file), remote_target)
-                    stats['synced'] += 1
-                    if callback:
-                        callback('success', str(rel_path), str(src_file), None)
-                except Exception as e:
-                    logger.error(f"远程同步失败: {rel_path} - {e}")
-                    stats['failed'] += 1
-                    try:
-                        self.transfer.ensure_connected()
-                    except Exception:
-                        pass
-                    if callback:
-                        callback('failed', str(rel_path), str(src_file), str(e))
+                pending.append((rel_path, src_file))
+        
+        if not stats.get('aborted'):
+            if len(pending) >= self.BULK_MIN_FILES and self.transfer.has_remote_tar():
+                self._bulk_upload(pending, stats, callback)
+            else:
+                if pending:
+                    self._ensure_remote_dirs(pending)
+                for rel_path, src_file in pending:
+                    if self.should_stop():
+                        logger.info(f"[{self.name}] 同步已取消")
+                        stats['aborted'] = True
+                        break
+                    self._upload_one(rel_path, src_file, stats, callback)
         
         logger.info(f"[{self.name}] 全量同步完成 - 成功: {stats['synced']}, 跳过: {stats['skipped']}, 失败: {stats['failed']}")
         return stats
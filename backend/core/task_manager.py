@@ -2,11 +2,19 @@
 任务管理器 - 管理多个同步任务的运行
 """
 
+import asyncio
 import threading
-from typing import Dict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Dict, Optional, Tuple
 from pathlib import Path
 import os
+import sys
 
+from backend.config.settings import load_config
 from backend.core.file_watcher import FileWatcher
 from backend.core.sync_engine import LocalSyncEngine, SshSyncEngine
 from backend.core.bidirectional import BidirectionalTaskRunner
@@ -16,18 +24,24 @@ from backend.models.sync_state import get_task_settings, get_endpoints
 from backend.utils.logger import logger
 from backend.utils.crypto import decrypt_secret
 from backend.utils.realtime import ws_hub
-from backend.utils.file_utils import should_exclude, should_include_extension
+from backend.utils.file_utils import compile_excluder, make_ext_filter, get_fs_type, is_network_fs
 
 
 class TaskRunner:
     """单个任务运行器"""
+
+    # 路径锁分段数：不同文件大多落在不同分段上，可并行同步
+    PATH_LOCK_STRIPES = 64
     
-    def __init__(self, task: SyncTask):
+    def __init__(self, task: SyncTask, loop: Optional[asyncio.AbstractEventLoop] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
         """
         初始化任务运行器
         
         Args:
             task: SyncTask 数据库模型对象
+            loop: 批量调度共用的事件循环（为空时启动任务使用 TaskManager 的共享循环）
+            executor: 各任务共用的同步线程池（为空时启动任务使用 TaskManager 的共享线程池）
         """
         # 在 Session 关闭前，提取并保存所有需要的属性值
         # 这样可以避免 SQLAlchemy "not bound to Session" 错误
@@ -57,6 +71,7 @@ class TaskRunner:
         self.target_type = task.target_type
         self.exclude_patterns = task.exclude_patterns or []
         self.file_extensions = task.file_extensions or []
+        self._compile_filters()
         
         self.watcher: Optional[FileWatcher] = None
         self.sync_engine = None
@@ -65,15 +80,86 @@ class TaskRunner:
         self._scan_stop = threading.Event()
         self._scan_thread: Optional[threading.Thread] = None
         self._scan_interval_seconds = 5
-        self._last_mtimes: Dict[str, float] = {}
+        # rel_path(interned) -> (st_mtime_ns, st_size, st_ino)
+        self._last_mtimes: Dict[str, Tuple[int, int, int]] = {}
+        self._mtime_tolerance_ns = 1_000_000_000  # 粗粒度文件系统（FAT/ext3）mtime 仅精确到秒，只对整秒 mtime 生效
         
         # 批量同步相关配置
-        self._batch_queue = []  # 待同步的事件队列: [(event_type, rel_path, src_path, dest_path), ...]
+        # 待同步的事件队列: rel_path -> (event_type, rel_path, src_path, dest_path)
+        # 以 rel_path 为键，入队即去重（同一文件只保留最新事件），内存上限为“唯一文件数”
+        self._batch_queue: "OrderedDict[str, tuple]" = OrderedDict()
         self._batch_lock = threading.Lock()
-        self._batch_event = threading.Event()
-        self._batch_thread: Optional[threading.Thread] = None
-        self._batch_delay = 0.5  # 收集事件的等待时间
+        self._batch_quiet = 0.1  # 首个事件到达后再收集一小段时间
         self._batch_max_parallel = 4  # 最大并行同步数
+        # 以下状态仅在事件循环线程中读写
+        self._loop = loop
+        self._shared_executor = executor
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_running = False
+
+        # 单文件限速：同一路径在 min_interval 内只同步一次，期间的事件合并后延后到下一拍
+        self._min_interval_seconds = self._configured_min_interval()
+        self._last_sync_ts: Dict[str, float] = {}
+        self._deferred: "OrderedDict[str, tuple]" = OrderedDict()  # rel_path -> (due, event)
+        self._deferred_timer: Optional[asyncio.TimerHandle] = None
+        self._deferred_due: Optional[float] = None
+
+        # 按路径分段的同步锁：兜底扫描线程与批量同步线程不会同时处理同一文件
+        self._path_locks = [threading.Lock() for _ in range(self.PATH_LOCK_STRIPES)]
+
+    @staticmethod
+    def _configured_min_interval() -> float:
+        """读取全局配置 sync_min_interval；配置文件缺失或无效时使用默认 1 秒"""
+        try:
+            return load_config().global_.sync_min_interval
+        except Exception as e:
+            logger.warning(f"读取 sync_min_interval 失败，使用默认值 1 秒: {e}")
+            return 1.0
+
+    def _compile_filters(self) -> None:
+        """
+        预编译排除规则与扩展名集合，扫描循环内不再逐条 fnmatch
+
+        语义与 should_exclude / should_include_extension 一致。
+        """
+        self._excluder = compile_excluder(self.exclude_patterns)
+        self._is_allowed_ext = make_ext_filter(self.file_extensions)
+
+    def _is_excluded(self, path_str: str, name: str) -> bool:
+        return self._excluder.matches(path_str, name)
+
+    @contextmanager
+    def _path_guard(self, *rel_paths: str):
+        """
+        持有给定路径对应的分段锁（moved 事件同时锁源与目标路径）
+
+        按分段序号升序加锁，避免两个线程以相反顺序获取而死锁。
+        """
+        stripes = sorted({hash(p) % self.PATH_LOCK_STRIPES for p in rel_paths if p})
+        locks = [self._path_locks[i] for i in stripes]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def _sync_path(self, event_type: str, rel_path: str, src_path: str, dest_path: str = ''):
+        """调用同步引擎处理单个文件事件，同一路径的同步串行执行"""
+        dest_rel = ''
+        if event_type == 'moved' and dest_path:
+            try:
+                dest_rel = str(Path(dest_path).relative_to(self.source_path))
+            except ValueError:
+                pass
+        with self._path_guard(rel_path, dest_rel):
+            engine = self.sync_engine
+            if not engine:
+                # 任务已停止
+                return False
+            return engine.sync_file(event_type, rel_path, src_path, dest_path)
 
     def _create_sync_engine(self):
         """根据任务配置创建同步引擎"""
@@ -92,6 +178,11 @@ class TaskRunner:
             except Exception as e:
                 logger.error(f"建立 SSH 连接失败: {e}")
                 raise
+            # 为批量并行同步预开 SFTP 通道，失败时退化为单通道串行
+            try:
+                self.sync_engine.transfer.open_sftp_pool(self._batch_max_parallel)
+            except Exception as e:
+                logger.warning(f"SFTP 通道池创建失败，使用单通道: {e}")
         else:
             raise ValueError(f"不支持的目标类型: {self.target_type}")
 
@@ -105,56 +196,79 @@ class TaskRunner:
         if not self.sync_engine:
             return
         source_root = Path(self.source_path)
-        current: Dict[str, float] = {}
+        current: Dict[str, Tuple[int, int, int]] = {}
 
         for root, dirs, files in os.walk(source_root):
             if self._scan_stop.is_set():
                 return
 
             # 过滤目录（基于绝对路径过滤即可）
-            dirs[:] = [d for d in dirs if not should_exclude(Path(root) / d, self.exclude_patterns)]
+            dirs[:] = [d for d in dirs if not self._is_excluded(os.path.join(root, d), d)]
 
             for filename in files:
-                abs_path = Path(root) / filename
-                if should_exclude(abs_path, self.exclude_patterns):
+                if not self._is_allowed_ext(filename):
                     continue
-                if not should_include_extension(abs_path, self.file_extensions):
+                if self._is_excluded(os.path.join(root, filename), filename):
                     continue
+                abs_path = Path(root) / filename
                 try:
-                    rel_path = str(abs_path.relative_to(source_root))
+                    rel_path = sys.intern(str(abs_path.relative_to(source_root)))
                 except Exception:
                     continue
                 try:
-                    mtime = abs_path.stat().st_mtime
+                    # 整数纳秒 mtime：避免浮点相等比较的精度问题。
+                    # 网络文件系统上也必须用 os.stat：需要向服务端校验属性才能看到其他主机的修改
+                    st = abs_path.stat()
+                    sig = (st.st_mtime_ns, st.st_size, st.st_ino)
                 except FileNotFoundError:
                     continue
 
-                current[rel_path] = mtime
-                last_mtime = self._last_mtimes.get(rel_path)
-                if last_mtime is None:
+                current[rel_path] = sig
+                last = self._last_mtimes.get(rel_path)
+                if last is None:
                     try:
-                        self.sync_engine.sync_file('created', rel_path, str(abs_path), '')
+                        self._sync_path('created', rel_path, str(abs_path))
                     except Exception as e:
                         logger.error(f"扫描同步失败(created): {rel_path} - {e}")
-                elif mtime != last_mtime:
+                elif sig != last:
+                    # 粗粒度文件系统：两次 mtime 都是整秒、大小与 inode 未变且差在容差内，视为同一版本
+                    if (sig[1:] == last[1:]
+                            and sig[0] % 1_000_000_000 == 0 and last[0] % 1_000_000_000 == 0
+                            and abs(sig[0] - last[0]) <= self._mtime_tolerance_ns):
+                        continue
                     try:
-                        self.sync_engine.sync_file('modified', rel_path, str(abs_path), '')
+                        self._sync_path('modified', rel_path, str(abs_path))
                     except Exception as e:
                         logger.error(f"扫描同步失败(modified): {rel_path} - {e}")
 
-        # 删除检测：之前存在，现在不存在
-        for rel_path in list(self._last_mtimes.keys()):
+        # 删除检测：之前存在，现在不存在（字典视图差集）
+        for rel_path in self._last_mtimes.keys() - current.keys():
             if self._scan_stop.is_set():
                 return
-            if rel_path not in current:
-                abs_path = source_root / rel_path
-                try:
-                    self.sync_engine.sync_file('deleted', rel_path, str(abs_path), '')
-                except Exception as e:
-                    logger.error(f"扫描同步失败(deleted): {rel_path} - {e}")
+            abs_path = source_root / rel_path
+            try:
+                self._sync_path('deleted', rel_path, str(abs_path))
+            except Exception as e:
+                logger.error(f"扫描同步失败(deleted): {rel_path} - {e}")
 
         self._last_mtimes = current
 
+    def _select_scan_interval(self) -> float:
+        """
+        根据源目录所在文件系统选择兜底扫描间隔
+
+        网络文件系统上 inotify 收不到其他主机的修改，扫描是主要手段，需频繁；
+        本地文件系统 watchdog 可靠，扫描只用于兜底（git checkout 等丢事件场景），放宽到 60s。
+        无法判断（非 Linux）时保持默认值。
+        """
+        fs_type = get_fs_type(self.source_path)
+        if fs_type is None:
+            return self._scan_interval_seconds
+        network = is_network_fs(fs_type)
+        interval = 2 if network else 60
+        logger.info(f"源目录文件系统: {fs_type}，兜底扫描间隔 {interval}s")
+        return interval
+
     def _scan_loop(self) -> None:
         while not self._scan_stop.is_set():
             if not self.is_running:
@@ -164,6 +278,8 @@ class TaskRunner:
                     self._scan_once()
             except Exception as e:
                 logger.error(f"扫描线程异常: {e}")
+            with self._batch_lock:
+                self._prune_sync_ts()
             self._scan_stop.wait(self._scan_interval_seconds)
     
     def _on_file_change(self, event_type: str, src_path: str, dest_path: str):
@@ -178,70 +294,136 @@ class TaskRunner:
         except ValueError:
             return
         
+        event = (event_type, rel_path, src_path, dest_path)
+        now = time.monotonic()
         with self._batch_lock:
-            self._batch_queue.append((event_type, rel_path, src_path, dest_path))
-        
-        # 通知批量处理线程
-        self._batch_event.set()
-    
-    def _batch_sync_loop(self):
-        """
-        批量同步处理线程
-        """
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        import time
+            last = self._last_sync_ts.get(rel_path)
+            if last is not None and now - last < self._min_interval_seconds:
+                # 刚同步过：延后到限速窗口结束，由单个定时器统一放回队列
+                self._deferred[rel_path] = (last + self._min_interval_seconds, event)
+                deferred = True
+            else:
+                self._deferred.pop(rel_path, None)
+                self._batch_queue[rel_path] = event
+                deferred = False
         
-        while not self._scan_stop.is_set():
-            # 等待新事件或超时
-            self._batch_event.wait(timeout=self._batch_delay)
-            self._batch_event.clear()
-            
-            if self._scan_stop.is_set():
-                break
-            
-            # 等待一小段时间收集更多事件
-            time.sleep(0.1)
-            
-            # 取出所有待同步的事件
-            with self._batch_lock:
-                if not self._batch_queue:
-                    continue
-                events = list(self._batch_queue)
-                self._batch_queue.clear()
-            
-            if not events:
-                continue
-            
-            # 去重：同一文件只处理最新的事件
-            unique_events = {}
-            for ev in events:
-                unique_events[ev[1]] = ev  # 用 rel_path 作为 key，保留最后一个事件
-            events = list(unique_events.values())
-            
-            logger.info(f"批量同步开始: {len(events)} 个文件")
-            start_time = time.time()
-            
-            # 並行执行同步
-            completed = 0
-            failed = 0
-            
-            with ThreadPoolExecutor(max_workers=self._batch_max_parallel) as executor:
-                futures = {
-                    executor.submit(self._sync_single_file, *ev): ev
-                    for ev in events
-                }
-                
-                for future in as_completed(futures):
-                    try:
-                        future.result()
-                        completed += 1
-                    except Exception as e:
-                        failed += 1
-                        ev = futures[future]
-                        logger.error(f"批量同步失败: {ev[1]} - {e}")
-            
-            elapsed = time.time() - start_time
-            logger.info(f"批量同步完成: 成功 {completed}, 失败 {failed}, 耗时 {elapsed:.2f}s")
+        # 交给事件循环线程调度（watchdog 回调线程不直接操作循环）
+        self._call_in_loop(self._arm_deferred_timer if deferred else self._schedule_flush)
+
+    def _call_in_loop(self, callback) -> None:
+        loop = self._loop
+        if loop is None or self._executor is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            # 循环已关闭
+            pass
+
+    def _arm_deferred_timer(self) -> None:
+        """按最早到期的延后事件（重新）设置定时器（事件循环线程）"""
+        with self._batch_lock:
+            if not self._deferred or self._scan_stop.is_set():
+                return
+            due = min(d for d, _ in self._deferred.values())
+        if self._deferred_timer is not None and self._deferred_due is not None and self._deferred_due <= due:
+            return
+        if self._deferred_timer is not None:
+            self._deferred_timer.cancel()
+        self._deferred_due = due
+        self._deferred_timer = self._loop.call_later(max(0.0, due - time.monotonic()), self._flush_deferred)
+
+    def _flush_deferred(self) -> None:
+        """定时器回调：将已到期的延后事件放回批量队列（事件循环线程）"""
+        now = time.monotonic()
+        self._deferred_timer = None
+        self._deferred_due = None
+        with self._batch_lock:
+            for rel_path, (due, event) in list(self._deferred.items()):
+                if due <= now:
+                    del self._deferred[rel_path]
+                    self._batch_queue[rel_path] = event
+            has_events = bool(self._batch_queue)
+        self._arm_deferred_timer()
+        if has_events:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """安排一次批量提交：静默期内到达的事件合并到同一批（事件循环线程）"""
+        if self._flush_handle is not None or self._batch_running or self._scan_stop.is_set():
+            return
+        self._flush_handle = self._loop.call_later(self._batch_quiet, self._flush)
+
+    def _flush(self) -> None:
+        """取出队列中的全部事件，交给线程池并行同步（事件循环线程）"""
+        self._flush_handle = None
+        if self._executor is None or self._scan_stop.is_set():
+            return
+        with self._batch_lock:
+            self._prune_sync_ts()
+            if not self._batch_queue:
+                return
+            events = list(self._batch_queue.values())
+            self._batch_queue.clear()
+        # 同一时刻只跑一批，保证同一文件的事件按顺序落地
+        self._batch_running = True
+        self._loop.create_task(self._run_batch(events))
+
+    def _prune_sync_ts(self) -> None:
+        """移除已超出限速窗口的同步时间记录（需持有 _batch_lock），避免长期运行时随文件数无限增长"""
+        if not self._last_sync_ts:
+            return
+        cutoff = time.monotonic() - self._min_interval_seconds
+        expired = [p for p, ts in self._last_sync_ts.items() if ts <= cutoff]
+        for rel_path in expired:
+            del self._last_sync_ts[rel_path]
+
+    async def _run_batch(self, events: list) -> None:
+        logger.info(f"批量同步开始: {len(events)} 个文件")
+        start_time = time.time()
+        completed = 0
+        failed = 0
+        # 线程池为各任务共用：单个任务同时占用的线程数不超过 _batch_max_parallel，大批量时不挤占其他任务
+        executor = self._executor
+        slots = asyncio.Semaphore(self._batch_max_parallel)
+
+        async def run(ev):
+            async with slots:
+                return await self._loop.run_in_executor(executor, self._sync_single_file, *ev)
+
+        try:
+            results = await asyncio.gather(*(run(ev) for ev in events), return_exceptions=True)
+            for ev, result in zip(events, results):
+                if isinstance(result, BaseException):
+                    failed += 1
+                    logger.error(f"批量同步失败: {ev[1]} - {result!r}")
+                else:
+                    completed += 1
+        except Exception as e:
+            # 线程池已关闭（任务停止中）
+            failed += len(events) - completed
+            logger.error(f"批量同步中断: {e}")
+        finally:
+            self._batch_running = False
+
+        elapsed = time.time() - start_time
+        logger.info(f"批量同步完成: 成功 {completed}, 失败 {failed}, 耗时 {elapsed:.2f}s")
+
+        # 批处理期间积累的新事件
+        with self._batch_lock:
+            pending = bool(self._batch_queue)
+        if pending:
+            self._schedule_flush()
+
+    def _cancel_scheduled(self) -> None:
+        """取消尚未触发的定时回调（事件循环线程）"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._deferred_timer is not None:
+            self._deferred_timer.cancel()
+            self._deferred_timer = None
+        self._deferred_due = None
     
     def _sync_single_file(self, event_type: str, rel_path: str, src_path: str, dest_path: str):
         """
@@ -250,21 +432,30 @@ class TaskRunner:
         status = 'success'
         error_message = None
         
+        # 不持有任务锁：同批文件并行同步，SSH 传输各自占用通道池中的一个通道；
+        # 同一路径由路径锁与兜底扫描互斥
+        engine = self.sync_engine
+        if not engine:
+            return
         try:
-            with self._lock:
-                if not self.sync_engine:
-                    return
-                ok = self.sync_engine.sync_file(event_type, rel_path, src_path, dest_path)
-                if ok is False:
-                    if hasattr(self.sync_engine, 'should_stop') and self.sync_engine.should_stop():
-                        status = 'skipped'
-                        error_message = '任务已停止'
-                    else:
-                        raise RuntimeError("同步失败")
+            ok = self._sync_path(event_type, rel_path, src_path, dest_path)
+            if ok is False:
+                if hasattr(engine, 'should_stop') and engine.should_stop():
+                    status = 'skipped'
+                    error_message = '任务已停止'
+                else:
+                    raise RuntimeError("同步失败")
         except Exception as e:
             status = 'failed'
             error_message = str(e)
             logger.error(f"处理文件变化失败: {e}")
+
+        if status == 'success':
+            with self._batch_lock:
+                if event_type == 'deleted':
+                    self._last_sync_ts.pop(rel_path, None)
+                else:
+                    self._last_sync_ts[rel_path] = time.monotonic()
         
         try:
             with get_db() as db:
@@ -290,6 +481,11 @@ class TaskRunner:
             
             # 创建同步引擎
             self._create_sync_engine()
+
+            # 批量调度：共享事件循环 + 各任务共用的有界同步线程池
+            if self._loop is None:
+                self._loop = task_manager.dispatch_loop()
+            self._executor = self._shared_executor or task_manager.sync_executor()
             
             # 创建文件监控器
             self.watcher = FileWatcher(
@@ -300,15 +496,12 @@ class TaskRunner:
             )
             
             # 启动监控
+            self._scan_stop.clear()
             self.watcher.start()
             self.is_running = True
 
-            # 启动批量同步处理线程
-            self._scan_stop.clear()
-            self._batch_thread = threading.Thread(target=self._batch_sync_loop, daemon=True)
-            self._batch_thread.start()
-
             # 启动兜底扫描线程（避免 watchdog 漏事件导致不同步）
+            self._scan_interval_seconds = self._select_scan_interval()
             self._scan_thread = threading.Thread(target=self._scan_loop, daemon=True)
             self._scan_thread.start()
             
@@ -316,6 +509,8 @@ class TaskRunner:
             
         except Exception as e:
             logger.error(f"✗ 启动任务失败: {self.task_name} - {e}")
+            if not self.is_running:
+                self._executor = None
             self.stop()
             raise
     
@@ -341,11 +536,14 @@ class TaskRunner:
             self._scan_thread.join(timeout=2)
         self._scan_thread = None
         
-        # 停止批量同步线程
-        self._batch_event.set()  # 唤醒线程
-        if self._batch_thread and self._batch_thread.is_alive():
-            self._batch_thread.join(timeout=2)
-        self._batch_thread = None
+        # 取消待触发的批量/限速定时器，丢弃尚未提交的事件
+        self._call_in_loop(self._cancel_scheduled)
+        with self._batch_lock:
+            self._deferred.clear()
+            self._batch_queue.clear()
+
+        # 线程池为各任务共用，不在这里关闭；已排队的本任务同步因 sync_engine 已清空而直接返回
+        self._executor = None
         
         self.is_running = False
         
@@ -387,10 +585,150 @@ class TaskRunner:
 
 class TaskManager:
     """任务管理器 - 管理所有同步任务"""
+
+    # 共用同步线程池的线程上限
+    SYNC_WORKERS = 8
     
     def __init__(self):
         self.runners: Dict[int, TaskRunner] = {}  # task_id -> TaskRunner
         self._lock = threading.Lock()
+        # 任务元数据缓存：task_id -> (task 快照, settings 快照, 双向端点配置)
+        # 任务配置运行期很少变化；API 修改/删除任务后调用 invalidate() 使其失效
+        self._task_meta_cache: Dict[int, Tuple[SimpleNamespace, Optional[SimpleNamespace], Optional[dict]]] = {}
+        self._meta_lock = threading.Lock()
+        # 所有单向任务共用的批量调度事件循环与同步线程池（惰性创建）
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # 任务状态推送合并：task_id -> 待推送状态，窗口内同一任务只推最后一次
+        self._status_delay = 0.05
+        self._pending_status: Dict[int, dict] = {}
+        self._status_flush_scheduled = False
+        self._status_lock = threading.Lock()
+
+    def dispatch_loop(self) -> asyncio.AbstractEventLoop:
+        """获取共享的批量调度事件循环，首次调用时在后台线程启动"""
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="sync-dispatch", daemon=True)
+                thread.start()
+                self._loop = loop
+                self._loop_thread = thread
+            return self._loop
+
+    def sync_executor(self) -> ThreadPoolExecutor:
+        """获取各单向任务共用的同步线程池（线程按需创建，总数有上限）"""
+        with self._loop_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.SYNC_WORKERS,
+                    thread_name_prefix="sync-worker"
+                )
+            return self._executor
+
+    def _build_endpoints(self, db, task) -> dict:
+        """
+        构建双向同步的端点配置字典
+
+        无端点记录时，回退为 a=本地源目录、b=任务目标。
+        """
+        endpoints = get_endpoints(db, task.id)
+        if not endpoints:
+            result = {
+                'a': {
+                    'type': 'local',
+                    'path': task.source_path
+                },
+                'b': {
+                    'type': task.target_type,
+                    'path': task.target_path,
+                    'host': task.target_host,
+                    'port': task.target_port,
+                    'username': task.target_username,
+                    'password': decrypt_secret(task.target_password),
+                    'ssh_key_path': task.target_ssh_key_path
+                }
+            }
+        else:
+            result = {
+                side: {
+                    'type': ep.type,
+                    'path': ep.path,
+                    'host': ep.host,
+                    'port': ep.port,
+                    'username': ep.username,
+                    'password': decrypt_secret(ep.password),
+                    'ssh_key_path': ep.ssh_key_path,
+                    'trash_dir': ep.trash_dir,
+                    'backup_dir': ep.backup_dir
+                }
+                for side, ep in endpoints.items()
+            }
+        return result
+
+    @staticmethod
+    def _snapshot(row) -> Optional[SimpleNamespace]:
+        """将 ORM 对象的列值复制为普通对象，脱离 Session 后仍可安全读取"""
+        if row is None:
+            return None
+        return SimpleNamespace(**{c.name: getattr(row, c.name) for c in row.__table__.columns})
+
+    def _queue_status(self, status_dict: dict) -> None:
+        """
+        登记一次任务状态推送（非阻塞）
+
+        由共享事件循环在短暂延迟后统一推送，同一任务在窗口内的多次变更合并为一条。
+        """
+        with self._status_lock:
+            pending = self._pending_status.setdefault(status_dict['task_id'], {})
+            pending.update(status_dict)
+            if self._status_flush_scheduled:
+                return
+            self._status_flush_scheduled = True
+        loop = self.dispatch_loop()
+        loop.call_soon_threadsafe(loop.call_later, self._status_delay, self._flush_status)
+
+    def _flush_status(self) -> None:
+        """推送合并后的任务状态（事件循环线程，或 stop_all 停止循环后调用）"""
+        with self._status_lock:
+            pending = self._pending_status
+            self._pending_status = {}
+            self._status_flush_scheduled = False
+        for status_dict in pending.values():
+            ws_hub.publish_task_status(status_dict)
+
+    def _get_task_meta(self, task_id: int) -> Tuple[SimpleNamespace, Optional[SimpleNamespace], Optional[dict]]:
+        """
+        读取任务、设置与双向端点配置（优先走缓存）
+
+        Raises:
+            ValueError: 任务不存在
+        """
+        with self._meta_lock:
+            cached = self._task_meta_cache.get(task_id)
+        if cached is not None:
+            return cached
+
+        with get_db() as db:
+            from backend.models.sync_task import get_task
+            task = get_task(db, task_id)
+            if not task:
+                raise ValueError(f"任务不存在: {task_id}")
+            settings = get_task_settings(db, task_id)
+            mode = settings.mode if settings else "one_way"
+            endpoints = self._build_endpoints(db, task) if mode == "two_way" else None
+            meta = (self._snapshot(task), self._snapshot(settings), endpoints)
+
+        with self._meta_lock:
+            self._task_meta_cache[task_id] = meta
+        return meta
+
+    def invalidate(self, task_id: int) -> None:
+        """任务配置变更后清除其元数据缓存"""
+        with self._meta_lock:
+            self._task_meta_cache.pop(task_id, None)
     
     def load_tasks_from_db(self):
         """从数据库加载所有启用的任务"""
@@ -417,65 +755,24 @@ class TaskManager:
                 logger.warning(f"任务已在运行: {task_id}")
                 return
             
-            # 从数据库加载任务
-            with get_db() as db:
-                from backend.models.sync_task import get_task
-                task = get_task(db, task_id)
-                
-                if not task:
-                    raise ValueError(f"任务不存在: {task_id}")
-                
-                if not task.enabled:
-                    raise ValueError(f"任务未启用: {task.name}")
-                
-                settings = get_task_settings(db, task_id)
-                mode = settings.mode if settings else "one_way"
-                
-                if mode == "two_way":
-                    endpoints = get_endpoints(db, task_id)
-                    if not endpoints:
-                        endpoints = {
-                            'a': {
-                                'type': 'local',
-                                'path': task.source_path
-                            },
-                            'b': {
-                                'type': task.target_type,
-                                'path': task.target_path,
-                                'host': task.target_host,
-                                'port': task.target_port,
-                                'username': task.target_username,
-                                'password': decrypt_secret(task.target_password),
-                                'ssh_key_path': task.target_ssh_key_path
-                            }
-                        }
-                    else:
-                        endpoints = {
-                            side: {
-                                'type': ep.type,
-                                'path': ep.path,
-                                'host': ep.host,
-                                'port': ep.port,
-                                'username': ep.username,
-                                'password': decrypt_secret(ep.password),
-                                'ssh_key_path': ep.ssh_key_path,
-                                'trash_dir': ep.trash_dir,
-                                'backup_dir': ep.backup_dir
-                            }
-                            for side, ep in endpoints.items()
-                        }
-                    runner = BidirectionalTaskRunner(task, endpoints, settings)
-                else:
-                    runner = TaskRunner(task)
-                
-                runner.start()
-                self.runners[task_id] = runner
-                ws_hub.publish_task_status({
-                    'task_id': task.id,
-                    'name': task.name,
-                    'enabled': task.enabled,
-                    'is_running': True
-                })
+            task, settings, endpoints = self._get_task_meta(task_id)
+            if not task.enabled:
+                raise ValueError(f"任务未启用: {task.name}")
+            
+            mode = settings.mode if settings else "one_way"
+            if mode == "two_way":
+                runner = BidirectionalTaskRunner(task, endpoints, settings)
+            else:
+                runner = TaskRunner(task, loop=self.dispatch_loop(), executor=self.sync_executor())
+            
+            runner.start()
+            self.runners[task_id] = runner
+            self._queue_status({
+                'task_id': task.id,
+                'name': task.name,
+                'enabled': task.enabled,
+                'is_running': True
+            })
     
     def stop_task(self, task_id: int):
         """
@@ -489,7 +786,7 @@ class TaskManager:
             if runner:
                 runner.stop()
                 del self.runners[task_id]
-                ws_hub.publish_task_status({
+                self._queue_status({
                     'task_id': task_id,
                     'is_running': False
                 })
@@ -516,54 +813,13 @@ class TaskManager:
         if runner:
             return runner.sync_all(force=force)
         
-        with get_db() as db:
-            from backend.models.sync_task import get_task
-            task = get_task(db, task_id)
-            
-            if not task:
-                raise ValueError(f"任务不存在: {task_id}")
-            
-            settings = get_task_settings(db, task_id)
-            mode = settings.mode if settings else "one_way"
-            
-            if mode == "two_way":
-                endpoints = get_endpoints(db, task_id)
-                if not endpoints:
-                    endpoints = {
-                        'a': {
-                            'type': 'local',
-                            'path': task.source_path
-                        },
-                        'b': {
-                            'type': task.target_type,
-                            'path': task.target_path,
-                            'host': task.target_host,
-                            'port': task.target_port,
-                            'username': task.target_username,
-                                'password': decrypt_secret(task.target_password),
-                            'ssh_key_path': task.target_ssh_key_path
-                        }
-                    }
-                else:
-                    endpoints = {
-                        side: {
-                            'type': ep.type,
-                            'path': ep.path,
-                            'host': ep.host,
-                            'port': ep.port,
-                            'username': ep.username,
-                                'password': decrypt_secret(ep.password),
-                            'ssh_key_path': ep.ssh_key_path,
-                            'trash_dir': ep.trash_dir,
-                            'backup_dir': ep.backup_dir
-                        }
-                        for side, ep in endpoints.items()
-                    }
-                temp_runner = BidirectionalTaskRunner(task, endpoints, settings)
-                return temp_runner.sync_all(force=force)
-            else:
-                temp_runner = TaskRunner(task)
-                return temp_runner.sync_all(force=force)
+        task, settings, endpoints = self._get_task_meta(task_id)
+        mode = settings.mode if settings else "one_way"
+        if mode == "two_way":
+            temp_runner = BidirectionalTaskRunner(task, endpoints, settings)
+        else:
+            temp_runner = TaskRunner(task)
+        return temp_runner.sync_all(force=force)
     
     def get_task_status(self, task_id: int) -> dict:
         """
@@ -603,6 +859,22 @@ class TaskManager:
         task_ids = list(self.runners.keys())
         for task_id in task_ids:
             self.stop_task(task_id)
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = None
+            self._loop_thread = None
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            # 未开始的同步直接取消
+            executor.shutdown(wait=False, cancel_futures=True)
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout=2)
+            if not loop.is_running():
+                loop.close()
+        # 循环已停止，未触发的合并推送在此直接发出，避免最后的状态丢失
+        self._flush_status()
         logger.info("✓ 所有任务已停止")
 
 
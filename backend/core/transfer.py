@@ -4,24 +4,57 @@
 封装 Paramiko 客户端，提供 SSH/SFTP 连接管理和文件操作。
 """
 
+import io
 import os
 import stat
 import time
+import queue
+import shlex
+import socket
+import tarfile
 import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Union, BinaryIO, Iterator, Tuple
+from typing import Optional, Union, BinaryIO, Iterable, Iterator, Tuple, List, Callable, Dict
 
 import paramiko
 from paramiko import SSHClient, SFTPClient, AutoAddPolicy, RejectPolicy, WarningPolicy
+from paramiko.sftp import CMD_STATUS
 
+from backend.core.ssh_pool import ssh_pool, make_pool_key
 from backend.utils.logger import logger
 
 
+# find -printf '%y' 的类型字符 -> st_mode 文件类型位
+_FIND_TYPE_MODES = {
+    'f': stat.S_IFREG,
+    'l': stat.S_IFLNK,
+    'p': stat.S_IFIFO,
+    's': stat.S_IFSOCK,
+    'c': stat.S_IFCHR,
+    'b': stat.S_IFBLK,
+}
+
+
 class SSHTransfer:
     """SSH 传输客户端"""
     
+    # 单个 SFTP 读写请求的数据块大小。OpenSSH sftp-server 单条消息上限 256KB（含包头），
+    # 超出会直接断开连接，因此默认沿用 paramiko 的 32KB，调大时需低于该上限。
+    DEFAULT_BLOCK_SIZE = 32768
+    # 读取预取时允许同时在途的请求数（None 表示不限制，交给 paramiko 决定）
+    DEFAULT_MAX_CONCURRENT_REQUESTS = 64
+    # 新开通道的接收窗口。paramiko 默认约 2MB，高延迟链路上会限制单通道吞吐（窗口/RTT）
+    DEFAULT_WINDOW_SIZE = 32 * 1024 * 1024
+    # 远程属性缓存有效期（秒）：只用于消除同一轮遍历/同步中的重复 stat
+    ATTR_CACHE_TTL = 2.0
+    # 远程 find 单次读取的超时（秒）：超时即放弃整次 find 结果，回退逐目录遍历
+    FIND_TIMEOUT = 600
+
     def __init__(self, host, port, username, password=None, key_filename=None,
-                 host_key_policy: Optional[str] = None, known_hosts_path: Optional[str] = None):
+                 host_key_policy: Optional[str] = None, known_hosts_path: Optional[str] = None,
+                 block_size: int = DEFAULT_BLOCK_SIZE,
+                 max_concurrent_requests: Optional[int] = DEFAULT_MAX_CONCURRENT_REQUESTS):
         self.host = host
         self.port = int(port)
         self.username = username
@@ -40,72 +73,200 @@ class SSHTransfer:
                 pass
         self.host_key_policy = host_key_policy or 'reject'
         self.known_hosts_path = known_hosts_path
+        self.block_size = int(block_size)
+        self.max_concurrent_requests = max_concurrent_requests
+        self._pool_key = make_pool_key(
+            self.host, self.port, self.username, self.password,
+            self.key_filename, self.host_key_policy, self.known_hosts_path
+        )
         
         self.ssh: Optional[SSHClient] = None
         self.sftp: Optional[SFTPClient] = None
         # Paramiko/SFTPClient 非线程安全：双向同步存在“轮询扫描线程”和“同步线程”并发访问同一连接的情况。
         # 用 RLock 确保同一连接上的 SFTP 操作不并发，避免卡死/无响应。
         self._io_lock = threading.RLock()
+        # 文件传输用的 SFTP 通道池：同一 SSH 连接上预先打开多个通道，供并行上传/下载复用
+        self._pool_size = 0
+        self._channel_pool: Optional[queue.Queue] = None
+        # 向连接池声明的通道数（主通道 + 通道池），释放时原样归还
+        self._held_channels = 0
+        self._reconnect_lock = threading.Lock()
+        # 远端是否有 POSIX shell / tar（None 表示尚未探测）
+        self._remote_posix: Optional[bool] = None
+        self._remote_tar: Optional[bool] = None
+        # 远程路径 -> (缓存时间, 属性)：iter_files/listdir_attr 顺带拿到的属性，供 stat/exists/is_dir 复用
+        self._attr_cache: Dict[str, Tuple[float, paramiko.SFTPAttributes]] = {}
+        self._attr_lock = threading.Lock()
+        
+    def _new_client(self) -> SSHClient:
+        """新建并连接 SSHClient（由连接池在无可复用连接时调用）"""
+        client = SSHClient()
+        if self.known_hosts_path:
+            path = Path(self.known_hosts_path)
+            if path.exists():
+                client.load_host_keys(str(path))
+            else:
+                client.load_system_host_keys()
+        else:
+            client.load_system_host_keys()
+        policy_map = {
+            'auto': AutoAddPolicy(),
+            'reject': RejectPolicy(),
+            'warning': WarningPolicy()
+        }
+        policy = policy_map.get(self.host_key_policy, RejectPolicy())
+        client.set_missing_host_key_policy(policy)
         
+        logger.info(f"正在连接 SSH: {self.username}@{self.host}:{self.port}")
+        client.connect(
+            hostname=self.host,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            key_filename=self.key_filename,
+            timeout=10,
+            banner_timeout=10
+        )
+        
+        self._tune_transport(client)
+        try:
+            transport = client.get_transport()
+            if transport:
+                transport.set_keepalive(30)
+        except Exception as e:
+            logger.debug(f"设置 SSH keepalive 失败: {e}")
+        if isinstance(policy, AutoAddPolicy) and self.known_hosts_path:
+            path = Path(self.known_hosts_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            client.save_host_keys(str(path))
+        return client
+
     def connect(self):
-        """建立 SSH 和 SFTP 连接"""
+        """建立 SSH 和 SFTP 连接（SSH 连接取自进程级连接池，SFTP 通道本实例独占）"""
         if self.ssh is not None:
             return
 
         try:
-            self.ssh = SSHClient()
-            if self.known_hosts_path:
-                path = Path(self.known_hosts_path)
-                if path.exists():
-                    self.ssh.load_host_keys(str(path))
-                else:
-                    self.ssh.load_system_host_keys()
-            else:
-                self.ssh.load_system_host_keys()
-            policy_map = {
-                'auto': AutoAddPolicy(),
-                'reject': RejectPolicy(),
-                'warning': WarningPolicy()
-            }
-            policy = policy_map.get(self.host_key_policy, RejectPolicy())
-            self.ssh.set_missing_host_key_policy(policy)
-            
-            logger.info(f"正在连接 SSH: {self.username}@{self.host}:{self.port}")
-            self.ssh.connect(
-                hostname=self.host,
-                port=self.port,
-                username=self.username,
-                password=self.password,
-                key_filename=self.key_filename,
-                timeout=10,
-                banner_timeout=10
-            )
-            
+            channels = 1 + self._pool_size
+            self.ssh = ssh_pool.acquire(self._pool_key, self._new_client, channels=channels)
+            self._held_channels = channels
             self.sftp = self.ssh.open_sftp()
             try:
                 # 防止网络抖动时 SFTP 调用无期限阻塞
                 self.sftp.get_channel().settimeout(30)
             except Exception:
                 pass
-            try:
-                transport = self.ssh.get_transport()
-                if transport:
-                    transport.set_keepalive(30)
-            except Exception as e:
-                logger.debug(f"设置 SSH keepalive 失败: {e}")
             logger.info("SSH/SFTP 连接成功")
-            if isinstance(policy, AutoAddPolicy) and self.known_hosts_path:
-                path = Path(self.known_hosts_path)
-                path.parent.mkdir(parents=True, exist_ok=True)
-                self.ssh.save_host_keys(str(path))
+            if self._pool_size:
+                # 重连后恢复通道池
+                self._open_channels(self._pool_size)
             
         except Exception as e:
-            self.ssh = None
-            self.sftp = None
+            self._release(discard=True)
             raise ConnectionError(f"SSH 连接失败: {e}")
 
-    def close(self):
-        """关闭连接"""
+    def _tune_transport(self, client: SSHClient) -> None:
+        """
+        调整传输层参数（需在打开 SFTP 通道之前调用）
+
+        - default_window_size 只影响之后新开的通道，主通道与通道池都会使用
+        - TCP_NODELAY 避免小请求（stat/mkdir 等）被 Nagle 算法延迟
+        不修改重新协商密钥的阈值，保持 paramiko 的默认安全策略。
+        """
+        try:
+            transport = client.get_transport()
+            if not transport:
+                return
+            transport.default_window_size = self.DEFAULT_WINDOW_SIZE
+            sock = transport.sock
+            if hasattr(sock, 'setsockopt'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except Exception as e:
+            logger.debug(f"调整 SSH 传输参数失败: {e}")
+
+    def _open_channels(self, size: int) -> None:
+        pool: queue.Queue = queue.Queue()
+        try:
+            for _ in range(size):
+                channel = self.ssh.open_sftp()
+                try:
+                    channel.get_channel().settimeout(30)
+                except Exception:
+                    pass
+                pool.put(channel)
+        except Exception:
+            # 部分通道已打开时（如超出 MaxSessions）逐个关闭，不留在连接上占用会话
+            while not pool.empty():
+                try:
+                    pool.get_nowait().close()
+                except Exception:
+                    pass
+            raise
+        self._channel_pool = pool
+
+    def open_sftp_pool(self, size: int) -> None:
+        """
+        预先打开 size 个 SFTP 通道用于并行文件传输
+
+        通道复用同一个 SSH 连接（Transport 本身线程安全），
+        每个通道同一时刻只被一个线程持有；元数据操作仍走主通道。
+        """
+        # 主通道加通道池不超过单条连接的 SFTP 通道上限
+        size = min(size, ssh_pool.MAX_CHANNELS_PER_CLIENT - 1)
+        if size <= 0:
+            return
+        self.ensure_connected()
+        # 按新的通道数重新向连接池占用连接（当前连接通道已满时会换到另一条连接）；
+        # 先取新的再还旧的，避免唯一引用归零导致连接被关闭后又重建
+        old_ssh, old_sftp, old_channels = self.ssh, self.sftp, self._held_channels
+        self.ssh = self.sftp = None
+        self._pool_size = size
+        try:
+            self.connect()
+        except Exception:
+            # 退回原来的单通道连接
+            self.ssh, self.sftp, self._held_channels = old_ssh, old_sftp, old_channels
+            self._pool_size = 0
+            raise
+        try:
+            old_sftp.close()
+        except Exception as e:
+            logger.debug(f"SFTP 连接关闭失败: {e}")
+        ssh_pool.release(self._pool_key, old_ssh, channels=old_channels)
+        logger.info(f"SFTP 通道池已就绪: {size} 个通道")
+
+    @contextmanager
+    def sftp_channel(self):
+        """借出一个 SFTP 通道；未启用通道池时退化为加锁使用主通道"""
+        pool = self._channel_pool
+        if pool is None:
+            with self._io_lock:
+                yield self.sftp
+            return
+        channel = pool.get()
+        try:
+            yield channel
+        finally:
+            pool.put(channel)
+
+    def _close_channels(self) -> None:
+        pool = self._channel_pool
+        self._channel_pool = None
+        if pool is None:
+            return
+        while True:
+            try:
+                channel = pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                channel.close()
+            except Exception as e:
+                logger.debug(f"SFTP 通道关闭失败: {e}")
+
+    def _release(self, discard: bool = False) -> None:
+        """关闭本实例的 SFTP 通道并把 SSH 连接归还连接池"""
+        self._close_channels()
         if self.sftp:
             try:
                 self.sftp.close()
@@ -114,12 +275,13 @@ class SSHTransfer:
             self.sftp = None
             
         if self.ssh:
-            try:
-                self.ssh.close()
-            except Exception as e:
-                logger.debug(f"SSH 连接关闭失败: {e}")
+            ssh_pool.release(self._pool_key, self.ssh, channels=self._held_channels, discard=discard)
             self.ssh = None
-            logger.info("SSH 连接已关闭")
+            self._held_channels = 0
+
+    def close(self):
+        """关闭连接"""
+        self._release()
 
     def ensure_connected(self):
         """确保连接可用，不可用则重连"""
@@ -129,14 +291,67 @@ class SSHTransfer:
         except Exception as e:
             logger.debug(f"SSH 连接状态检查失败: {e}")
             
-        logger.warning("SSH 连接已断开，尝试重连...")
-        self.close()
-        self.connect()
+        with self._reconnect_lock:
+            # 并行线程可能已完成重连
+            try:
+                if self.ssh and self.ssh.get_transport() and self.ssh.get_transport().is_active():
+                    return
+            except Exception:
+                pass
+            logger.warning("SSH 连接已断开，尝试重连...")
+            self._release(discard=True)
+            self.connect()
+
+    @staticmethod
+    def _attr_key(remote_path: str) -> str:
+        return remote_path.rstrip('/') or '/'
+
+    def _cache_attr(self, remote_path: str, attr: paramiko.SFTPAttributes) -> None:
+        key = self._attr_key(remote_path)
+        now = time.monotonic()
+        cutoff = now - self.ATTR_CACHE_TTL
+        with self._attr_lock:
+            cache = self._attr_cache
+            # 先删后插，使字典插入顺序与缓存时间一致
+            cache.pop(key, None)
+            cache[key] = (now, attr)
+            # 从最旧的一端剔除过期条目：已删除的远程路径不会再被查询，不清理会随轮询无限增长
+            while True:
+                oldest = next(iter(cache))
+                if cache[oldest][0] >= cutoff:
+                    break
+                del cache[oldest]
+
+    def _cached_attr(self, remote_path: str) -> Optional[paramiko.SFTPAttributes]:
+        key = self._attr_key(remote_path)
+        with self._attr_lock:
+            item = self._attr_cache.get(key)
+            if item is None:
+                return None
+            if time.monotonic() - item[0] > self.ATTR_CACHE_TTL:
+                del self._attr_cache[key]
+                return None
+            return item[1]
+
+    def _invalidate_attr(self, remote_path: str, recursive: bool = False) -> None:
+        """使路径（recursive 时连同其下所有路径）的属性缓存失效"""
+        key = self._attr_key(remote_path)
+        with self._attr_lock:
+            self._attr_cache.pop(key, None)
+            if recursive:
+                prefix = key.rstrip('/') + '/'
+                for k in [k for k in self._attr_cache if k.startswith(prefix)]:
+                    del self._attr_cache[k]
 
     def stat(self, remote_path: str):
+        attr = self._cached_attr(remote_path)
+        if attr is not None:
+            return attr
         self.ensure_connected()
         with self._io_lock:
-            return self.sftp.stat(remote_path)
+            attr = self.sftp.stat(remote_path)
+        self._cache_attr(remote_path, attr)
+        return attr
 
     def iter_files(self, remote_root: str) -> Iterator[Tuple[str, paramiko.SFTPAttributes]]:
         self.ensure_connected()
@@ -153,21 +368,119 @@ class SSHTransfer:
                 name = attr.filename
                 rel_path = f"{rel_base}/{name}" if rel_base else name
                 remote_path = f"{current}/{name}"
+                self._cache_attr(remote_path, attr)
                 if stat.S_ISDIR(attr.st_mode):
                     stack.append((rel_path, remote_path))
                 else:
                     yield rel_path, attr
 
+    def iter_files_fast(self, remote_root: str) -> Iterator[Tuple[str, paramiko.SFTPAttributes]]:
+        """
+        用一条远程 find 命令列出整棵目录树（一次往返），结果与 iter_files 相同
+
+        iter_files 每个目录一次 listdir 往返，目录多时延迟累积明显。
+        远端无 POSIX shell、find 不支持 -printf（如 busybox）或中途出错时回退到 iter_files，
+        不会混入不完整的 find 结果。
+        """
+        root = remote_root.rstrip('/') or '/'
+        if not self.has_posix_shell():
+            yield from self.iter_files(remote_root)
+            return
+
+        try:
+            items = self._list_files_find(root)
+        except Exception as e:
+            # 超时、断线或 find 失败：丢弃部分结果，整棵树改用逐目录遍历
+            logger.debug(f"远程 find 列举失败，改用逐目录遍历: {e}")
+            yield from self.iter_files(remote_root)
+            return
+
+        prefix = root.rstrip('/')
+        for rel_path, attr in items:
+            self._cache_attr(f"{prefix}/{rel_path}", attr)
+        yield from items
+
+    def _list_files_find(self, root: str) -> List[Tuple[str, paramiko.SFTPAttributes]]:
+        """
+        执行远程 find 并解析全部结果；只有完整成功才返回
+
+        Raises:
+            IOError: find 退出码非 0
+        """
+        self.ensure_connected()
+        # 类型、权限、大小、mtime、相对路径；NUL 结尾，文件名含换行也能正确切分
+        command = f"find {shlex.quote(root)} -mindepth 1 ! -type d -printf '%y\\t%m\\t%s\\t%T@\\t%P\\0'"
+        # 超时作用于每次读取：大目录树上 find 可能长时间无输出，给足余量
+        _, stdout, stderr = self.ssh.exec_command(command, timeout=self.FIND_TIMEOUT)
+
+        items = []
+        pending = b''
+        while True:
+            chunk = stdout.read(65536)
+            if not chunk:
+                break
+            records = (pending + chunk).split(b'\0')
+            pending = records.pop()
+            for record in records:
+                item = self._parse_find_record(record)
+                if item is not None:
+                    items.append(item)
+
+        code = stdout.channel.recv_exit_status()
+        if code != 0:
+            err = stderr.read().decode('utf-8', errors='replace').strip()
+            raise IOError(f"find 退出码 {code}: {err}")
+        return items
+
+    @staticmethod
+    def _parse_find_record(record: bytes) -> Optional[Tuple[str, paramiko.SFTPAttributes]]:
+        try:
+            kind, perm, size, mtime, rel = record.decode('utf-8', errors='replace').split('\t', 4)
+            attr = paramiko.SFTPAttributes()
+            attr.filename = rel.rsplit('/', 1)[-1]
+            attr.st_mode = _FIND_TYPE_MODES.get(kind, stat.S_IFREG) | int(perm, 8)
+            attr.st_size = int(size)
+            # SFTP v3 的 mtime 为整秒，与 stat() 结果保持一致
+            attr.st_mtime = int(float(mtime))
+        except ValueError:
+            return None
+        return rel, attr
+
     def listdir_attr(self, remote_path: str):
         self.ensure_connected()
         try:
             with self._io_lock:
-                return self.sftp.listdir_attr(remote_path)
+                entries = self.sftp.listdir_attr(remote_path)
         except FileNotFoundError:
             return []
+        base = remote_path.rstrip('/')
+        for attr in entries:
+            self._cache_attr(f"{base}/{attr.filename}", attr)
+        return entries
 
     def remove_dir_recursive(self, remote_path: str):
+        """
+        递归删除远程目录：优先一条 `rm -rf`，命令不可用或失败时逐项 SFTP 删除
+
+        Raises:
+            ValueError: 路径少于两级或含 `..`（防止误删根目录/上级目录）
+        """
+        parts = [p for p in remote_path.split('/') if p and p != '.']
+        if len(parts) < 2 or '..' in parts:
+            raise ValueError(f"拒绝递归删除远程路径: {remote_path}")
         self.ensure_connected()
+        self._invalidate_attr(remote_path, recursive=True)
+        if self.has_posix_shell():
+            try:
+                code, _, err = self._run_command(f"rm -rf -- {shlex.quote(remote_path)}", timeout=300)
+                if code == 0:
+                    return
+                logger.debug(f"远程 rm -rf 返回 {code}，改用 SFTP 删除: {err.strip()}")
+            except Exception as e:
+                logger.debug(f"远程 rm -rf 执行失败，改用 SFTP 删除: {e}")
+        self._remove_dir_sftp(remote_path)
+
+    def _remove_dir_sftp(self, remote_path: str):
         try:
             with self._io_lock:
                 entries = self.sftp.listdir_attr(remote_path)
@@ -177,7 +490,7 @@ class SSHTransfer:
             name = attr.filename
             child = f"{remote_path.rstrip('/')}/{name}"
             if stat.S_ISDIR(attr.st_mode):
-                self.remove_dir_recursive(child)
+                self._remove_dir_sftp(child)
             else:
                 try:
                     with self._io_lock:
@@ -190,69 +503,225 @@ class SSHTransfer:
         except Exception:
             pass
 
+    def _open_prefetched(self, sftp: SFTPClient, remote_path: str):
+        """
+        打开远程文件并预取全部内容：一次性发出多个读请求，避免逐块等待往返
+
+        不超过一个数据块的小文件不预取（paramiko 每次预取都会起一个线程），
+        调用方按返回的大小读取，一个读请求即可取完。
+
+        Returns:
+            (SFTPFile, 文件大小)
+        """
+        f = sftp.open(remote_path, 'rb')
+        try:
+            f.MAX_REQUEST_SIZE = self.block_size
+            size = f.stat().st_size
+            if size > self.block_size:
+                f.prefetch(size, self.max_concurrent_requests)
+        except Exception:
+            f.close()
+            raise
+        return f, size
+
     def read_file_bytes(self, remote_path: str) -> bytes:
         self.ensure_connected()
-        with self._io_lock:
-            with self.sftp.open(remote_path, 'rb') as f:
-                return f.read()
+        with self.sftp_channel() as sftp:
+            f, size = self._open_prefetched(sftp, remote_path)
+            with f:
+                # 按 stat 得到的大小读取，省去末尾确认 EOF 的一次往返
+                return f.read(size)
+
+    def _pipelined_write(self, sftp: SFTPClient, reader: BinaryIO, remote_path: str) -> int:
+        """
+        流水线写入远程文件：写请求连续发出，不逐个等待服务端确认
+
+        paramiko 的流水线写请求以 type(None) 登记，只在积压超过 100 个且有数据可读时才检查状态，
+        关闭文件时会直接丢弃其余响应。因此关闭前按发送顺序逐个读取全部写响应：
+        任一写入失败（ENOSPC、配额、EIO 等）都会抛出 IOError，而不是留下被截断的远程文件。
+
+        Raises:
+            IOError: 服务端拒绝任一写请求
+        """
+        written = 0
+        with sftp.open(remote_path, 'wb', bufsize=self.block_size) as remote:
+            remote.set_pipelined(True)
+            remote.MAX_REQUEST_SIZE = self.block_size
+            while True:
+                chunk = reader.read(self.block_size)
+                if not chunk:
+                    break
+                remote.write(chunk)
+                written += len(chunk)
+            # 缓冲区中剩余的数据也作为写请求发出
+            remote.flush()
+            # 本通道由调用方独占，未确认的写请求都在 _reqs 中，按序等待即可一一对应
+            while remote._reqs:
+                t, _ = sftp._read_response(remote._reqs.popleft())
+                if t != CMD_STATUS:
+                    raise IOError(f"写入远程文件时收到非预期响应: {remote_path}")
+        return written
 
     def write_file_bytes(self, remote_path: str, data: bytes):
         self.ensure_connected()
         remote_dir = os.path.dirname(remote_path)
-        if remote_dir and not self.exists(remote_dir):
-            self.mkdir_p(remote_dir)
-        with self._io_lock:
-            with self.sftp.open(remote_path, 'wb') as f:
-                f.write(data)
+        self._ensure_dir(remote_dir)
+        self._invalidate_attr(remote_path)
+        with self.sftp_channel() as sftp:
+            self._pipelined_write(sftp, io.BytesIO(data), remote_path)
 
     def download_file(self, remote_path: str, local_path: str):
         self.ensure_connected()
         Path(local_path).parent.mkdir(parents=True, exist_ok=True)
-        with self._io_lock:
-            self.sftp.get(remote_path, local_path)
+        with self.sftp_channel() as sftp:
+            f, size = self._open_prefetched(sftp, remote_path)
+            with f:
+                if size > self.LARGE_DOWNLOAD_SIZE:
+                    self._download_large(f, size, local_path)
+                    return
+                with open(local_path, 'wb') as out:
+                    # 预取的数据到达即写入本地，不等整个文件
+                    remaining = size
+                    while remaining > 0:
+                        chunk = f.read(min(self.block_size, remaining))
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                        remaining -= len(chunk)
+
+    # 超过该大小的下载预分配本地空间并按 1MB 批量写入
+    LARGE_DOWNLOAD_SIZE = 4 * 1024 * 1024
+    DOWNLOAD_WRITE_SIZE = 1024 * 1024
+
+    def _download_large(self, f: paramiko.SFTPFile, size: int, local_path: str):
+        """
+        大文件下载：先按远程大小预分配（减少碎片、空间不足时尽早失败），
+        再从预取缓冲区每次取 1MB 直接 os.write，绕过 Python 文件对象的缓冲层
+        """
+        fd = os.open(local_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            if hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(fd, 0, size)
+                except OSError as e:
+                    # 部分文件系统不支持（如某些网络/FUSE 文件系统），不影响下载
+                    logger.debug(f"预分配本地空间失败: {e}")
+            written = 0
+            while written < size:
+                chunk = f.read(min(self.DOWNLOAD_WRITE_SIZE, size - written))
+                if not chunk:
+                    break
+                view = memoryview(chunk)
+                while view:
+                    n = os.write(fd, view)
+                    view = view[n:]
+                written += len(chunk)
+            if written < size:
+                # 远程文件在下载期间变短：去掉预分配的多余部分
+                os.ftruncate(fd, written)
+        finally:
+            os.close(fd)
 
     def exists(self, remote_path: str) -> bool:
         """检查远程文件是否存在"""
-        self.ensure_connected()
         try:
-            with self._io_lock:
-                self.sftp.stat(remote_path)
+            self.stat(remote_path)
             return True
         except FileNotFoundError:
             return False
 
     def is_dir(self, remote_path: str) -> bool:
         """检查远程路径是否为目录"""
-        self.ensure_connected()
         try:
-            with self._io_lock:
-                attr = self.sftp.stat(remote_path)
+            attr = self.stat(remote_path)
             return stat.S_ISDIR(attr.st_mode)
         except FileNotFoundError:
             return False
 
+    # 单条 mkdir -p 命令最多携带的目录数（避免命令行过长）
+    MKDIR_BATCH_SIZE = 200
+
     def mkdir_p(self, remote_path: str):
-        """递归创建远程目录"""
+        """递归创建远程目录（优先一条 `mkdir -p`，不可用时逐级 stat/mkdir）"""
+        self.mkdir_many([remote_path])
+
+    def mkdir_many(self, remote_paths: Iterable[str]):
+        """
+        批量递归创建远程目录
+
+        远端有 POSIX shell 时合并成 `mkdir -p A B C`，一次往返建完；
+        命令失败（如路径被文件占用）或无 shell 时回退到逐级 SFTP 创建。
+        """
         self.ensure_connected()
+        paths = sorted({p for p in remote_paths if p and p not in ('/', '.')})
+        for i in range(0, len(paths), self.MKDIR_BATCH_SIZE):
+            batch = paths[i:i + self.MKDIR_BATCH_SIZE]
+            if self._mkdir_p_remote(batch):
+                continue
+            for path in batch:
+                self._mkdir_p_sftp(path)
+
+    def _ensure_dir(self, remote_dir: str):
+        """确保远程目录存在：一次 stat 取得类型后本地判断，缺失时创建"""
+        if not remote_dir or remote_dir in ('/', '.'):
+            return
+        try:
+            attr = self.stat(remote_dir)
+        except FileNotFoundError:
+            self.mkdir_p(remote_dir)
+            return
+        if not stat.S_ISDIR(attr.st_mode):
+            raise FileExistsError(f"{remote_dir} 已存在且不是目录")
+
+    def _remember_dirs(self, remote_paths: Iterable[str]):
+        """刚创建成功的目录记入属性缓存，紧随其后的上传不必再 stat 目标目录"""
+        for path in remote_paths:
+            attr = paramiko.SFTPAttributes()
+            attr.st_mode = stat.S_IFDIR | 0o755
+            self._cache_attr(path, attr)
+
+    def _mkdir_p_remote(self, remote_paths: List[str]) -> bool:
+        if not self.has_posix_shell():
+            return False
+        for path in remote_paths:
+            self._invalidate_attr(path)
+        command = 'mkdir -p -- ' + ' '.join(shlex.quote(p) for p in remote_paths)
+        try:
+            code, _, err = self._run_command(command)
+        except Exception as e:
+            logger.debug(f"远程 mkdir -p 执行失败，改用 SFTP 创建: {e}")
+            return False
+        if code != 0:
+            logger.debug(f"远程 mkdir -p 返回 {code}，改用 SFTP 创建: {err.strip()}")
+            return False
+        self._remember_dirs(remote_paths)
+        return True
+
+    def _mkdir_p_sftp(self, remote_path: str):
         if remote_path == '/' or remote_path == '.':
             return
             
-        if self.exists(remote_path):
-            if self.is_dir(remote_path):
+        try:
+            attr = self.stat(remote_path)
+        except FileNotFoundError:
+            attr = None
+        if attr is not None:
+            if stat.S_ISDIR(attr.st_mode):
                 return
-            else:
-                raise FileExistsError(f"{remote_path} 已存在且不是目录")
+            raise FileExistsError(f"{remote_path} 已存在且不是目录")
         
         parent = os.path.dirname(remote_path.rstrip('/'))
         if parent:
-            self.mkdir_p(parent)
+            self._mkdir_p_sftp(parent)
             
+        self._invalidate_attr(remote_path)
         try:
             with self._io_lock:
                 self.sftp.mkdir(remote_path)
         except OSError:
             # 并发情况下可能刚被创建
-            pass
+            return
+        self._remember_dirs([remote_path])
 
     def upload_file(self, local_file: Union[str, BinaryIO], remote_path: str):
         """上传文件"""
@@ -260,22 +729,24 @@ class SSHTransfer:
         
         # 确保目录存在
         remote_dir = os.path.dirname(remote_path)
-        if not self.exists(remote_dir):
-            self.mkdir_p(remote_dir)
+        self._ensure_dir(remote_dir)
             
+        self._invalidate_attr(remote_path)
         try:
-            with self._io_lock:
+            with self.sftp_channel() as sftp:
                 if isinstance(local_file, str):
-                    self.sftp.put(local_file, remote_path)
+                    with open(local_file, 'rb') as reader:
+                        self._pipelined_write(sftp, reader, remote_path)
                 else:
-                    # 传入的是文件对象（例如 BytesIO），直接 putfo
-                    self.sftp.putfo(local_file, remote_path)
+                    # 传入的是文件对象（例如 BytesIO）
+                    self._pipelined_write(sftp, local_file, remote_path)
         except Exception as e:
             raise IOError(f"文件上传失败: {e}")
 
     def delete_file(self, remote_path: str):
         """删除远程文件"""
         self.ensure_connected()
+        self._invalidate_attr(remote_path)
         try:
             with self._io_lock:
                 self.sftp.remove(remote_path)
@@ -290,9 +761,10 @@ class SSHTransfer:
         
         # 确保目标目录存在
         remote_dest_dir = os.path.dirname(remote_dest)
-        if not self.exists(remote_dest_dir):
-            self.mkdir_p(remote_dest_dir)
+        self._ensure_dir(remote_dest_dir)
             
+        self._invalidate_attr(remote_src)
+        self._invalidate_attr(remote_dest)
         try:
             # POSIX rename：如果目标存在，通常会覆盖，但 paramiko 行为依赖服务端
             # 为安全起见，先删目标（如果存在）
@@ -306,3 +778,93 @@ class SSHTransfer:
                 self.sftp.rename(remote_src, remote_dest)
         except Exception as e:
             raise IOError(f"文件移动失败: {e}")
+
+    def _run_command(self, command: str, timeout: float = 30) -> Tuple[int, str, str]:
+        """
+        在远端执行一条命令
+
+        Returns:
+            (退出码, stdout, stderr)
+        """
+        self.ensure_connected()
+        _, stdout, stderr = self.ssh.exec_command(command, timeout=timeout)
+        out = stdout.read().decode('utf-8', errors='replace')
+        err = stderr.read().decode('utf-8', errors='replace')
+        return stdout.channel.recv_exit_status(), out, err
+
+    def has_posix_shell(self) -> bool:
+        """
+        探测远端是否为 POSIX shell（结果缓存；Windows OpenSSH 默认 cmd.exe 返回 False）
+
+        命令本身执行失败（如会话数已满、断线）不代表远端不支持，本次按 False 处理但不缓存。
+        """
+        if self._remote_posix is None:
+            try:
+                code, _, _ = self._run_command('command -v mkdir >/dev/null 2>&1', timeout=10)
+            except Exception as e:
+                logger.debug(f"探测远端 shell 失败: {e}")
+                return False
+            self._remote_posix = code == 0
+        return self._remote_posix
+
+    def has_remote_tar(self) -> bool:
+        """探测远端是否可用 tar（结果缓存；Windows OpenSSH 等无 POSIX shell 的环境返回 False，执行失败时不缓存）"""
+        if self._remote_tar is None:
+            try:
+                code, _, _ = self._run_command('command -v tar >/dev/null 2>&1', timeout=10)
+            except Exception as e:
+                logger.debug(f"探测远端 tar 失败: {e}")
+                return False
+            self._remote_tar = code == 0
+        return self._remote_tar
+
+    def bulk_upload(self, remote_root: str, files: List[Tuple[str, str]],
+                    content_fn: Optional[Callable[[str], Optional[bytes]]] = None) -> int:
+        """
+        通过单个 exec 通道以 tar 流批量上传文件
+
+        小文件很多时，逐个 SFTP open/write/close 的往返开销远大于数据本身；
+        这里把所有文件打成 tar 流写入远端 `tar -xf -`，整批只需一次往返。
+
+        Args:
+            remote_root: 远程根目录（不存在时在同一命令中创建）
+            files: [(相对路径, 本地绝对路径), ...]
+            content_fn: 可选，返回替换后的文件内容（如换行符转换）；返回 None 则使用原文件
+
+        Returns:
+            上传的文件数
+
+        Raises:
+            IOError: 远端 tar 解包失败
+        """
+        if not files:
+            return 0
+        self.ensure_connected()
+        self._invalidate_attr(remote_root, recursive=True)
+        root = shlex.quote(remote_root)
+        # 首次同步时根目录可能还不存在，tar -C 不会自动创建
+        command = f"mkdir -p -- {root} && tar -xf - -C {root}"
+        stdin, stdout, stderr = self.ssh.exec_command(command)
+        try:
+            with tarfile.open(fileobj=stdin, mode='w|', format=tarfile.PAX_FORMAT) as tar:
+                for rel_path, local_path in files:
+                    arcname = rel_path.replace('\\', '/')
+                    with open(local_path, 'rb') as f:
+                        # 按已打开的文件取属性：符号链接按目标文件上传，与 SFTP put 一致
+                        info = tar.gettarinfo(arcname=arcname, fileobj=f)
+                        # 归属由远端登录用户决定
+                        info.uid = info.gid = 0
+                        info.uname = info.gname = ''
+                        data = content_fn(local_path) if content_fn else None
+                        if data is not None:
+                            info.size = len(data)
+                            tar.addfile(info, io.BytesIO(data))
+                        else:
+                            tar.addfile(info, f)
+        finally:
+            stdin.close()
+        code = stdout.channel.recv_exit_status()
+        if code != 0:
+            err = stderr.read().decode('utf-8', errors='replace').strip()
+            raise IOError(f"批量上传失败 (tar 退出码 {code}): {err}")
+        return len(files)
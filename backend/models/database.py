@@ -2,11 +2,14 @@
 数据库连接和初始化
 """
 
+import sys
+
 from sqlalchemy import create_engine, text, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
 
+from backend.utils import fastjson
 from backend.utils.logger import logger
 
 # 创建基类
@@ -44,6 +47,9 @@ def init_database(database_url: str = "sqlite:///./data/sync.db"):
     engine = create_engine(
         database_url,
         connect_args={"check_same_thread": False, "timeout": 30} if database_url.startswith("sqlite") else {},
+        # JSON 列（文件状态元数据等）读写走 orjson（可用时）
+        json_serializer=fastjson.dumps,
+        json_deserializer=fastjson.loads,
         echo=False  # 设置为 True 可以看到 SQL 语句
     )
 
@@ -55,6 +61,11 @@ def init_database(database_url: str = "sqlite:///./data/sync.db"):
                 cursor.execute("PRAGMA journal_mode=WAL")
                 cursor.execute("PRAGMA synchronous=NORMAL")
                 cursor.execute("PRAGMA busy_timeout=5000")
+                # 同步状态表读多：64MB 页缓存、临时表放内存，非 Windows 再开 256MB mmap 读
+                cursor.execute("PRAGMA cache_size=-65536")
+                cursor.execute("PRAGMA temp_store=MEMORY")
+                if sys.platform != 'win32':
+                    cursor.execute("PRAGMA mmap_size=268435456")
                 cursor.close()
             except Exception:
                 pass
@@ -82,6 +93,20 @@ def init_database(database_url: str = "sqlite:///./data/sync.db"):
                 conn.commit()
             except Exception:
                 pass
+            try:
+                # 已有库的表不会被 create_all 补建索引
+                conn.execute(text("CREATE INDEX IF NOT EXISTS ix_synclog_task_time ON sync_logs (task_id, sync_time DESC)"))
+                conn.commit()
+            except Exception:
+                pass
+            try:
+                # 让 SQLite 按需更新统计信息，查询规划器才会选用新索引
+                conn.execute(text("PRAGMA optimize"))
+            except Exception:
+                pass
+    # 任务/端点读写都要加解密密码，顺带预热密钥
+    from backend.utils.crypto import warmup
+    warmup()
     logger.info("✓ 数据库初始化完成")
 
 
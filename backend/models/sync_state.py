@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from backend.models.database import Base
@@ -82,18 +83,15 @@ def get_endpoints(db: Session, task_id: int) -> Dict[str, SyncEndpoint]:
 
 
 def replace_endpoints(db: Session, task_id: int, endpoints: Dict[str, Dict]) -> Dict[str, SyncEndpoint]:
+    # 删除与新增放在同一个事务里，只提交一次
     db.query(SyncEndpoint).filter(SyncEndpoint.task_id == task_id).delete()
-    db.commit()
     result = {}
     for side, data in endpoints.items():
-        payload = dict(data)
-        payload['password'] = encrypt_secret(payload.get('password'))
-        endpoint = SyncEndpoint(task_id=task_id, side=side, **payload)
+        endpoint = SyncEndpoint(task_id=task_id, side=side, **data)
+        endpoint.password = encrypt_secret(data.get('password'))
         db.add(endpoint)
         result[side] = endpoint
     db.commit()
-    for side, endpoint in result.items():
-        db.refresh(endpoint)
     return result
 
 
@@ -115,3 +113,60 @@ def upsert_file_state(db: Session, task_id: int, rel_path: str, data: Dict) -> S
     db.commit()
     db.refresh(state)
     return state
+
+
+# SQLite 单条语句的绑定参数上限（老版本为 999），按列数折算每批行数
+_SQLITE_MAX_VARIABLES = 999
+
+
+def bulk_upsert_file_states(db: Session, task_id: int, items: List[Dict]) -> int:
+    """
+    批量写入文件同步状态，整批只提交一次
+
+    SQLite 下使用 INSERT ... ON CONFLICT(task_id, rel_path) DO UPDATE，
+    不逐行查询、也不回读自增 id。
+
+    Args:
+        items: 每项为 {'rel_path': ..., 其余 SyncFileState 字段...}
+
+    Returns:
+        写入的行数
+    """
+    if not items:
+        return 0
+    now = datetime.now()
+    rows = [{**item, 'task_id': task_id, 'updated_at': now} for item in items]
+
+    if db.get_bind().dialect.name != 'sqlite':
+        for row in rows:
+            data = {k: v for k, v in row.items() if k not in ('task_id', 'rel_path')}
+            state = db.query(SyncFileState).filter(
+                SyncFileState.task_id == task_id,
+                SyncFileState.rel_path == row['rel_path']
+            ).first()
+            if not state:
+                state = SyncFileState(task_id=task_id, rel_path=row['rel_path'])
+                db.add(state)
+            for key, value in data.items():
+                setattr(state, key, value)
+        db.commit()
+        return len(rows)
+
+    columns = set()
+    for row in rows:
+        columns.update(row)
+    # 多行 VALUES 要求每行列一致：缺少的列补 None
+    for row in rows:
+        for col in columns.difference(row):
+            row[col] = None
+    batch_size = max(1, _SQLITE_MAX_VARIABLES // len(columns))
+    update_cols = [c for c in columns if c not in ('task_id', 'rel_path')]
+    for i in range(0, len(rows), batch_size):
+        stmt = sqlite_insert(SyncFileState).values(rows[i:i + batch_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['task_id', 'rel_path'],
+            set_={c: stmt.excluded[c] for c in update_cols}
+        )
+        db.execute(stmt)
+    db.commit()
+    return len(rows)
@@ -3,8 +3,8 @@
 """
 
 from datetime import datetime
-from typing import List
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey, JSON
+from typing import List, Optional, Tuple
+from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey, JSON, Index, tuple_
 from sqlalchemy.orm import relationship
 
 from backend.models.database import Base
@@ -70,6 +70,10 @@ class SyncLog(Base):
         return f"<SyncLog [{self.event_type}] {self.file_path} - {self.status}>"
 
 
+# 按任务查看日志（task_id 过滤 + sync_time 倒序）直接走索引顺序，免全表扫描和排序
+Index('ix_synclog_task_time', SyncLog.task_id, SyncLog.sync_time.desc())
+
+
 # 数据库操作辅助函数
 
 def create_task(db, task_data: dict) -> SyncTask:
@@ -155,6 +159,25 @@ def get_logs(db, task_id: int = None, limit: int = 100, offset: int = 0) -> List
     return query.offset(offset).limit(limit).all()
 
 
+def get_logs_after(db, task_id: int = None, cursor: Optional[Tuple[datetime, int]] = None,
+                   limit: int = 100) -> List[SyncLog]:
+    """
+    按游标分页获取日志（keyset 分页）
+
+    与 offset 分页不同，翻到多深都只需从游标处沿索引继续读 limit 行。
+
+    Args:
+        cursor: 上一页最后一条的 (sync_time, id)；None 表示第一页
+    """
+    query = db.query(SyncLog)
+    if task_id:
+        query = query.filter(SyncLog.task_id == task_id)
+    if cursor is not None:
+        query = query.filter(tuple_(SyncLog.sync_time, SyncLog.id) < tuple_(*cursor))
+    query = query.order_by(SyncLog.sync_time.desc(), SyncLog.id.desc())
+    return query.limit(limit).all()
+
+
 def get_log_stats(db, task_id: int = None) -> dict:
     """获取日志统计"""
     from sqlalchemy import func
@@ -3,6 +3,8 @@
 """
 
 import os
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -13,7 +15,8 @@ from backend.utils.logger import logger
 
 _SECRET_PREFIX = "enc:"
 _ENV_KEY = "TONGBU_SECRET_KEY"
-_FERNET = None
+_FERNET: Optional[Fernet] = None
+_FERNET_LOCK = threading.Lock()
 
 
 def _get_repo_root() -> Path:
@@ -47,9 +50,28 @@ def _load_or_create_key() -> bytes:
 
 def _get_fernet() -> Fernet:
     global _FERNET
-    if _FERNET is None:
-        _FERNET = Fernet(_load_or_create_key())
-    return _FERNET
+    fernet = _FERNET
+    if fernet is None:
+        # 多个线程首次同时取用时只读/生成一次密钥文件
+        with _FERNET_LOCK:
+            if _FERNET is None:
+                _FERNET = Fernet(_load_or_create_key())
+            fernet = _FERNET
+    return fernet
+
+
+def warmup() -> None:
+    """启动时预先加载密钥并创建 Fernet，避免首个请求里读取密钥文件"""
+    try:
+        _get_fernet()
+    except Exception as e:
+        logger.warning(f"加密密钥预加载失败: {e}")
+
+
+@lru_cache(maxsize=256)
+def _decrypt_token(token: str) -> str:
+    """解密结果按密文缓存：任务/端点每次读取都会解密同一批密码（解密失败不缓存）"""
+    return _get_fernet().decrypt(token.encode("utf-8")).decode("utf-8")
 
 
 def encrypt_secret(value: Optional[str]) -> Optional[str]:
@@ -66,9 +88,8 @@ def decrypt_secret(value: Optional[str]) -> Optional[str]:
         return value
     if not value.startswith(_SECRET_PREFIX):
         return value
-    token = value[len(_SECRET_PREFIX):].encode("utf-8")
     try:
-        return _get_fernet().decrypt(token).decode("utf-8")
+        return _decrypt_token(value[len(_SECRET_PREFIX):])
     except InvalidToken as e:
         logger.error(f"密钥不匹配，无法解密: {e}")
         return None
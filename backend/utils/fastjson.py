@@ -0,0 +1,27 @@
+"""
+JSON 序列化：安装了 orjson 时使用 orjson（解析/序列化快数倍），否则回退标准库 json
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except TypeError:
+            # orjson 不支持的类型（如非字符串键）交给标准库处理
+            pass
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
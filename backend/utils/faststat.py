@@ -0,0 +1,111 @@
+"""
+轻量文件元数据获取
+
+Linux 上通过 statx(AT_STATX_DONT_SYNC) 只取类型/大小/mtime/inode：
+在 NFS/CIFS 等网络文件系统上不强制向服务端重新校验属性，直接使用本地缓存。
+其他平台或内核/libc 不支持 statx 时回退到 os.stat。
+
+注意：因为不向服务端校验，结果可能长期看不到其他主机的修改，不能用于变更检测
+（如兜底扫描）；只适合能容忍过期属性的场景，由调用方显式选用。
+本地文件系统上经 ctypes 调用的开销高于 os.stat。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import sys
+from functools import lru_cache
+from typing import NamedTuple, Union
+
+
+_AT_FDCWD = -100
+_AT_STATX_DONT_SYNC = 0x4000
+_STATX_TYPE = 0x0001
+_STATX_MTIME = 0x0040
+_STATX_INO = 0x0100
+_STATX_SIZE = 0x0200
+_STATX_MASK = _STATX_TYPE | _STATX_MTIME | _STATX_INO | _STATX_SIZE
+
+
+class FastStat(NamedTuple):
+    mode: int
+    size: int
+    mtime_ns: int
+    ino: int
+
+
+class _StatxTimestamp(ctypes.Structure):
+    _fields_ = [
+        ('tv_sec', ctypes.c_int64),
+        ('tv_nsec', ctypes.c_uint32),
+        ('_reserved', ctypes.c_int32),
+    ]
+
+
+class _Statx(ctypes.Structure):
+    # 与 <linux/stat.h> 的 struct statx 布局一致；内核会写满 256 字节，尾部保留区必须留足
+    _fields_ = [
+        ('stx_mask', ctypes.c_uint32),
+        ('stx_blksize', ctypes.c_uint32),
+        ('stx_attributes', ctypes.c_uint64),
+        ('stx_nlink', ctypes.c_uint32),
+        ('stx_uid', ctypes.c_uint32),
+        ('stx_gid', ctypes.c_uint32),
+        ('stx_mode', ctypes.c_uint16),
+        ('_spare0', ctypes.c_uint16),
+        ('stx_ino', ctypes.c_uint64),
+        ('stx_size', ctypes.c_uint64),
+        ('stx_blocks', ctypes.c_uint64),
+        ('stx_attributes_mask', ctypes.c_uint64),
+        ('stx_atime', _StatxTimestamp),
+        ('stx_btime', _StatxTimestamp),
+        ('stx_ctime', _StatxTimestamp),
+        ('stx_mtime', _StatxTimestamp),
+        ('stx_rdev_major', ctypes.c_uint32),
+        ('stx_rdev_minor', ctypes.c_uint32),
+        ('stx_dev_major', ctypes.c_uint32),
+        ('stx_dev_minor', ctypes.c_uint32),
+        ('_spare2', ctypes.c_uint64 * 14),
+    ]
+
+
+@lru_cache(maxsize=None)
+def _statx_func():
+    """探测 libc 是否提供可用的 statx（只探测一次）；不可用返回 None"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        func = libc.statx
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint, ctypes.POINTER(_Statx)]
+    func.restype = ctypes.c_int
+    buf = _Statx()
+    if func(_AT_FDCWD, b'/', _AT_STATX_DONT_SYNC, _STATX_MASK, ctypes.byref(buf)) != 0:
+        # ENOSYS（老内核）或被 seccomp 拦截
+        return None
+    return func
+
+
+def has_statx() -> bool:
+    return _statx_func() is not None
+
+
+def fast_stat(path: Union[str, os.PathLike]) -> FastStat:
+    """
+    获取文件的 (mode, size, mtime_ns, ino)，跟随符号链接（与 os.stat 一致）
+
+    Raises:
+        OSError: 与 os.stat 相同（如 FileNotFoundError）
+    """
+    func = _statx_func()
+    if func is not None:
+        buf = _Statx()
+        if func(_AT_FDCWD, os.fsencode(path), _AT_STATX_DONT_SYNC, _STATX_MASK, ctypes.byref(buf)) == 0:
+            mtime = buf.stx_mtime
+            return FastStat(buf.stx_mode, buf.stx_size, mtime.tv_sec * 1_000_000_000 + mtime.tv_nsec, buf.stx_ino)
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err), os.fspath(path))
+    st = os.stat(path)
+    return FastStat(st.st_mode, st.st_size, st.st_mtime_ns, st.st_ino)
@@ -3,18 +3,58 @@
 """
 
 import os
+import re
 import fnmatch
 from pathlib import Path
-from typing import List
+from typing import Callable, Iterable, List, Optional, Union
 
 
-def should_exclude(file_path: str | Path, exclude_patterns: List[str]) -> bool:
+class Excluder:
+    """
+    预编译的排除规则
+
+    所有通配符合并为一个正则，“路径某一段恰好等于规则”的判断用集合求交，
+    每个路径只做常数次匹配，不再按规则条数逐条 fnmatch。
+    """
+
+    __slots__ = ('patterns', '_regex', '_segments')
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = tuple(patterns or ())
+        self._segments = frozenset(self.patterns)
+        # 与 fnmatch.fnmatch 一致：规则和待匹配串都做 normcase（Windows 下大小写不敏感）
+        self._regex = (
+            re.compile('|'.join(fnmatch.translate(os.path.normcase(p)) for p in self.patterns))
+            if self.patterns else None
+        )
+
+    def matches(self, path_str: str, name: str) -> bool:
+        """已拆好路径和文件名时的快速判断（path_str 需为规范化路径）"""
+        if self._regex is None:
+            return False
+        if self._regex.match(os.path.normcase(name)) or self._regex.match(os.path.normcase(path_str)):
+            return True
+        return not self._segments.isdisjoint(path_str.split(os.sep))
+
+    def __call__(self, file_path: Union[str, Path]) -> bool:
+        if self._regex is None:
+            return False
+        file_path = Path(file_path)
+        return self.matches(str(file_path), file_path.name)
+
+
+def compile_excluder(exclude_patterns: Iterable[str]) -> Excluder:
+    """编译排除规则，供需要反复判断的调用方（扫描、监控）按任务缓存"""
+    return Excluder(exclude_patterns)
+
+
+def should_exclude(file_path: str | Path, exclude_patterns: Union[List[str], Excluder]) -> bool:
     """
     检查文件是否应该被排除
     
     Args:
         file_path: 文件路径
-        exclude_patterns: 排除规则列表（支持通配符）
+        exclude_patterns: 排除规则列表（支持通配符），或 compile_excluder 编译好的规则
         
     Returns:
         True 表示应该排除，False 表示应该同步
@@ -27,6 +67,9 @@ def should_exclude(file_path: str | Path, exclude_patterns: List[str]) -> bool:
         >>> should_exclude("src/main.py", ["*.pyc"])
         False
     """
+    if isinstance(exclude_patterns, Excluder):
+        return exclude_patterns(file_path)
+
     file_path = Path(file_path)
     path_str = str(file_path)
     
@@ -46,6 +89,31 @@ def should_exclude(file_path: str | Path, exclude_patterns: List[str]) -> bool:
     return False
 
 
+def _suffix_lower(path_str: str) -> str:
+    """取小写扩展名，语义同 Path(path_str).suffix.lower()，但不构造 Path 对象"""
+    name = path_str[max(path_str.rfind('/'), path_str.rfind(os.sep)) + 1:]
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[i:].lower()
+    return ''
+
+
+def make_ext_filter(allowed_extensions: Iterable[str]) -> Callable[[str | Path], bool]:
+    """
+    编译扩展名白名单，返回判断函数（扩展名不区分大小写；空列表允许所有）
+
+    供扫描/监控等需要逐个文件判断的调用方按任务缓存。
+    """
+    allowed = frozenset(e.lower() for e in (allowed_extensions or ()))
+    if not allowed:
+        return lambda file_path: True
+
+    def ext_filter(file_path: str | Path) -> bool:
+        return _suffix_lower(os.fspath(file_path)) in allowed
+
+    return ext_filter
+
+
 def should_include_extension(file_path: str | Path, allowed_extensions: List[str]) -> bool:
     """
     检查文件扩展名是否在允许列表中
@@ -58,13 +126,7 @@ def should_include_extension(file_path: str | Path, allowed_extensions: List[str
     Returns:
         True 表示应该同步，False 表示应该排除
     """
-    if not allowed_extensions:
-        return True
-    
-    file_path = Path(file_path)
-    ext = file_path.suffix.lower()
-    
-    return ext in allowed_extensions
+    return make_ext_filter(allowed_extensions)(file_path)
 
 
 def get_relative_path(file_path: str | Path, base_path: str | Path) -> Path:
@@ -95,6 +157,52 @@ def ensure_parent_dir(file_path: str | Path):
     file_path.parent.mkdir(parents=True, exist_ok=True)
 
 
+# 网络/用户态文件系统：inotify 无法感知其他主机上的修改，需要更频繁的兜底扫描
+NETWORK_FS_TYPES = frozenset({'nfs', 'nfs4', 'cifs', 'smb', 'smb2', 'smb3', 'smbfs', 'fuse', '9p', 'sshfs'})
+
+
+def get_fs_type(path: str | Path, mounts_file: str = '/proc/mounts') -> Optional[str]:
+    """
+    获取路径所在挂载点的文件系统类型（仅 Linux，通过 /proc/mounts 判断）
+    
+    Args:
+        path: 文件或目录路径
+        mounts_file: 挂载表文件
+        
+    Returns:
+        文件系统类型（如 'ext4'、'nfs4'、'fuse.sshfs'），无法判断时返回 None
+    """
+    try:
+        target = os.path.realpath(path)
+        with open(mounts_file, 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    
+    best_len = -1
+    best_type = None
+    for line in lines:
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        # 挂载点中的空格等字符以八进制转义（如 \040）
+        mount_point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), parts[1])
+        prefix = mount_point.rstrip('/') + '/'
+        if target == mount_point or target.startswith(prefix):
+            if len(mount_point) > best_len:
+                best_len = len(mount_point)
+                best_type = parts[2]
+    return best_type
+
+
+def is_network_fs(fs_type: Optional[str]) -> bool:
+    """判断文件系统类型是否为网络/用户态文件系统"""
+    if not fs_type:
+        return False
+    fs_type = fs_type.lower()
+    return fs_type in NETWORK_FS_TYPES or fs_type.split('.', 1)[0] in NETWORK_FS_TYPES
+
+
 if __name__ == '__main__':
     # 测试代码
     test_patterns = ["*.pyc", "__pycache__", ".git", "node_modules"]
@@ -17,6 +17,9 @@ LOG_FORMAT = (
     "<level>{message}</level>"
 )
 
+# 文件输出不着色，使用不含颜色标记的格式（布局与控制台一致）
+FILE_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} | {message}"
+
 
 def setup_logger(log_level: str = "INFO", log_dir: str = "./logs"):
     """
@@ -37,24 +40,30 @@ def setup_logger(log_level: str = "INFO", log_dir: str = "./logs"):
         colorize=True
     )
     
+    # 文件输出走后台队列（enqueue），同步线程记日志时不阻塞在磁盘写入上；
+    # 进程退出时 loguru 的 atexit 钩子会移除处理器并写完队列中剩余的记录
     # 文件输出 - 所有日志
     logger.add(
         log_path / "file_sync_{time:YYYY-MM-DD}.log",
-        format=LOG_FORMAT,
+        format=FILE_FORMAT,
         level=log_level,
         rotation="00:00",  # 每天零点创建新文件
         retention="30 days",  # 保留30天
-        encoding="utf-8"
+        encoding="utf-8",
+        enqueue=True,
+        diagnose=False  # 异常栈不展开变量值，减少格式化开销，也避免把密码等写进日志文件
     )
     
     # 文件输出 - 仅错误日志
     logger.add(
         log_path / "errors_{time:YYYY-MM-DD}.log",
-        format=LOG_FORMAT,
+        format=FILE_FORMAT,
         level="ERROR",
         rotation="00:00",
         retention="90 days",  # 错误日志保留更久
-        encoding="utf-8"
+        encoding="utf-8",
+        enqueue=True,
+        diagnose=False
     )
     
     logger.info(f"日志系统初始化完成，级别: {log_level}")
@@ -3,72 +3,181 @@ WebSocket 实时推送
 """
 
 import asyncio
-import threading
-from typing import Dict, Optional
+import sys
+from typing import Dict, List, Optional, Set, Tuple
 
 from fastapi import WebSocket
 
+from backend.utils import fastjson
+
+# 只用于 hub 自己创建的任务，不替换整个事件循环的任务工厂
+_eager_task_factory = asyncio.eager_task_factory if sys.version_info >= (3, 12) else None
+
 
 class WebSocketHub:
+    """
+    WebSocket 推送中心
+
+    连接表只在事件循环线程内读写（连接/断开/广播都是循环上的协程），因此不加锁；
+    其他线程通过 publish_* 把广播投递到循环上执行。
+    日志先进入队列，由单个消费任务攒批后一次发送，减少高频日志下的帧数与循环唤醒。
+    """
+
+    LOG_BATCH_SIZE = 256
+
     def __init__(self):
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._log_clients: Dict[WebSocket, Optional[int]] = {}
-        self._status_clients: Dict[WebSocket, bool] = {}
-        self._lock = threading.Lock()
+        # 按订阅的任务建索引：广播只触达相关连接
+        self._all_logs: Set[WebSocket] = set()
+        self._by_task: Dict[int, Set[WebSocket]] = {}
+        self._status_clients: Set[WebSocket] = set()
+        self._tasks = set()
+        self._log_queue: Optional[asyncio.Queue] = None
+        self._log_consumer: Optional[asyncio.Task] = None
 
     def set_loop(self, loop: asyncio.AbstractEventLoop):
+        """绑定事件循环并启动日志消费任务（需在该循环内调用）"""
         self._loop = loop
+        self._log_queue = asyncio.Queue()
+        self._log_consumer = loop.create_task(self._consume_logs())
+
+    def close(self):
+        if self._log_consumer is not None:
+            self._log_consumer.cancel()
+            self._log_consumer = None
 
     async def connect_logs(self, websocket: WebSocket, task_id: Optional[int] = None):
         await websocket.accept()
-        with self._lock:
-            self._log_clients[websocket] = task_id
+        self._log_clients[websocket] = task_id
+        if task_id:
+            self._by_task.setdefault(task_id, set()).add(websocket)
+        else:
+            self._all_logs.add(websocket)
 
     async def connect_status(self, websocket: WebSocket):
         await websocket.accept()
-        with self._lock:
-            self._status_clients[websocket] = True
+        self._status_clients.add(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        with self._lock:
-            self._log_clients.pop(websocket, None)
-            self._status_clients.pop(websocket, None)
+        loop = self._loop
+        if loop is not None and not self._in_loop():
+            loop.call_soon_threadsafe(self._remove, websocket)
+            return
+        self._remove(websocket)
+
+    def _remove(self, websocket: WebSocket):
+        task_id = self._log_clients.pop(websocket, None)
+        if task_id:
+            subscribers = self._by_task.get(task_id)
+            if subscribers is not None:
+                subscribers.discard(websocket)
+                if not subscribers:
+                    del self._by_task[task_id]
+        self._all_logs.discard(websocket)
+        self._status_clients.discard(websocket)
+
+    def _in_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _submit(self, coro):
+        """在事件循环上运行协程：已在循环线程内直接建任务，其他线程才走线程安全投递"""
+        loop = self._loop
+        if self._in_loop():
+            if _eager_task_factory is not None:
+                # 3.12+ 立即执行到第一个真正挂起点；不需要等待的广播当场完成，省一次循环调度
+                task = _eager_task_factory(loop, coro)
+                if task.done():
+                    return
+            else:
+                task = loop.create_task(coro)
+            # 持有引用直到完成，避免任务被提前回收
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, loop)
 
     def publish_log(self, log_dict: dict):
-        if not self._loop:
+        if not self._loop or self._log_queue is None:
             return
-        asyncio.run_coroutine_threadsafe(self._broadcast_log(log_dict), self._loop)
+        if self._in_loop():
+            self._log_queue.put_nowait(log_dict)
+        else:
+            self._loop.call_soon_threadsafe(self._log_queue.put_nowait, log_dict)
 
     def publish_task_status(self, status_dict: dict):
         if not self._loop:
             return
-        asyncio.run_coroutine_threadsafe(self._broadcast_status(status_dict), self._loop)
-
-    async def _broadcast_log(self, log_dict: dict):
-        dead = []
-        with self._lock:
-            targets = list(self._log_clients.items())
-        for ws, task_id in targets:
-            if task_id and task_id != log_dict.get('task_id'):
-                continue
+        if not self._status_clients and self._in_loop():
+            return
+        self._submit(self._broadcast_status(status_dict))
+
+    async def _consume_logs(self):
+        queue = self._log_queue
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty() and len(batch) < self.LOG_BATCH_SIZE:
+                batch.append(queue.get_nowait())
             try:
-                await ws.send_json({"type": "log", "data": log_dict})
+                await self._broadcast_logs(batch)
             except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self.disconnect(ws)
+                # 单批发送异常不能让消费任务退出
+                pass
+
+    async def _broadcast_logs(self, batch: List[dict]):
+        if not self._log_clients:
+            return
+        # 发送期间可能有连接加入/断开，先取快照；每个连接只收到它订阅的日志
+        targets: Dict[WebSocket, List[dict]] = dict.fromkeys(self._all_logs, batch)
+        if self._by_task:
+            by_task: Dict[int, List[dict]] = {}
+            for log_dict in batch:
+                by_task.setdefault(log_dict.get('task_id'), []).append(log_dict)
+            for task_id, logs in by_task.items():
+                for ws in self._by_task.get(task_id, ()):
+                    targets[ws] = logs
+        # 同一份日志列表只序列化一次，订阅相同内容的连接共用
+        payloads: Dict[int, str] = {}
+        sends = []
+        for ws, logs in targets.items():
+            payload = payloads.get(id(logs))
+            if payload is None:
+                # 只有一条时沿用单条 log 消息，兼容旧客户端
+                if len(logs) == 1:
+                    message = {"type": "log", "data": logs[0]}
+                else:
+                    message = {"type": "log_batch", "data": logs}
+                payload = payloads[id(logs)] = fastjson.dumps(message)
+            sends.append((ws, payload))
+        await self._send_all(sends)
 
     async def _broadcast_status(self, status_dict: dict):
-        dead = []
-        with self._lock:
-            targets = list(self._status_clients.keys())
-        for ws in targets:
+        if not self._status_clients:
+            return
+        payload = fastjson.dumps({"type": "task_status", "data": status_dict})
+        # 发送列表在第一次 await 之前同步构建完毕，直接遍历连接表即可，无需另取快照
+        await self._send_all([(ws, payload) for ws in self._status_clients])
+
+    async def _send_all(self, sends: List[Tuple[WebSocket, str]]):
+        """并发发送：慢连接不拖累其他连接；发送失败的连接移除"""
+        if len(sends) == 1:
+            # 常见的单连接情况直接发送，不经 gather 额外建任务
+            ws, payload = sends[0]
             try:
-                await ws.send_json({"type": "task_status", "data": status_dict})
+                await ws.send_text(payload)
             except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self.disconnect(ws)
+                self._remove(ws)
+            return
+        results = await asyncio.gather(
+            *(ws.send_text(payload) for ws, payload in sends),
+            return_exceptions=True,
+        )
+        for (ws, _), result in zip(sends, results):
+            if isinstance(result, Exception):
+                self._remove(ws)
 
 
 ws_hub = WebSocketHub()
@@ -443,6 +443,10 @@ const app = createApp({
                             this.wsLastHeartbeatAt.logs = Date.now();
                             this.wsLastMessageAt.logs = Date.now();
                             this.handleLogMessage(msg.data);
+                        } else if (msg.type === 'log_batch') {
+                            this.wsLastHeartbeatAt.logs = Date.now();
+                            this.wsLastMessageAt.logs = Date.now();
+                            msg.data.forEach((log) => this.handleLogMessage(log));
                         }
                     } catch (error) {
                         console.warn('日志推送解析失败', error);
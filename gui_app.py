@@ -2,26 +2,28 @@
 import os
 import sys
 import threading
-import time
 import socket
-import uvicorn
-import webview
-import pystray
-from PIL import Image
-from multiprocessing import Process, freeze_support
+from functools import lru_cache
+from multiprocessing import freeze_support
+
+# uvicorn/后端、pywebview、pystray、PIL 导入较重，推迟到各自线程或首次使用处，
+# 让窗口尽早创建出来
 
 # 将当前目录添加到 sys.path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
-from backend.app import app
-from backend.utils.logger import logger
+# 资源根目录：PyInstaller 打包后在 _MEIPASS（_internal）下，开发环境为源码目录
+FROZEN = getattr(sys, 'frozen', False)
+BASE_PATH = sys._MEIPASS if FROZEN else current_dir
+FRONTEND_PATH = os.path.join(BASE_PATH, 'frontend')
 
 # 全局变量
 window = None
 tray_icon = None
 server_port = None
 is_exiting = False
+SERVER_READY = threading.Event()
 
 def get_free_port():
     """获取一个空闲端口"""
@@ -32,30 +34,27 @@ def get_free_port():
 
 def start_server(port):
     """启动后端服务"""
+    import uvicorn
+    from backend.app import app
+
+    class NotifyingServer(uvicorn.Server):
+        """启动完成（lifespan 执行完毕并开始监听）后置位 SERVER_READY"""
+
+        async def startup(self, sockets=None):
+            await super().startup(sockets=sockets)
+            if self.started:
+                SERVER_READY.set()
+
     # 禁用 uvicorn 的控制台日志，避免干扰
-    uvicorn.run(app, host="127.0.0.1", port=port, log_level="error")
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error")
+    NotifyingServer(config).run()
 
 def check_server_ready(port):
-    """检查服务器是否就绪，然后跳转"""
-    target_url = f"http://127.0.0.1:{port}"
-    
-    # 轮询等待端口响应
-    start_time = time.time()
-    while time.time() - start_time < 30: # 最多等待30秒
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(1)
-                if s.connect_ex(('127.0.0.1', port)) == 0:
-                    # 服务器已就绪，稍微停一下确保 app 加载完毕
-                    time.sleep(1)
-                    if window:
-                        # 核心：在主线程中加载新 URL
-                        # pywebview 的 load_url 是线程安全的（在大多数平台上）
-                        webview.windows[0].load_url(target_url)
-                    return
-        except:
-            pass
-        time.sleep(0.5)
+    """等待服务器就绪，然后跳转"""
+    if SERVER_READY.wait(timeout=30) and window: # 最多等待30秒
+        # 核心：在主线程中加载新 URL
+        # pywebview 的 load_url 是线程安全的（在大多数平台上）
+        window.load_url(f"http://127.0.0.1:{port}")
 
 def on_window_closing():
     """拦截窗口关闭事件"""
@@ -95,32 +94,33 @@ def quit_app(icon, item):
 
 def resource_path(relative_path):
     """获取资源的绝对路径，兼容开发和PyInstaller打包环境"""
-    if getattr(sys, 'frozen', False):
-        # PyInstaller 打包后的路径
-        base_path = sys._MEIPASS
-    else:
-        # 开发环境路径
-        base_path = os.path.dirname(os.path.abspath(__file__))
-    return os.path.join(base_path, relative_path)
+    return os.path.join(BASE_PATH, relative_path)
 
-def setup_tray():
-    """设置系统托盘"""
-    global tray_icon
-    
-    # 使用 resource_path 查找图标
-    icon_path = resource_path("icon.ico")
+@lru_cache(maxsize=4)
+def load_tray_icon(icon_path):
+    """加载并解码托盘图标（按路径缓存，重建托盘时不再重复解码）"""
+    from PIL import Image
     
     # 尝试加载图标
-    image = None
     if os.path.exists(icon_path):
         try:
             image = Image.open(icon_path)
+            image.load() # Image.open 是惰性的，这里完成解码
+            return image
         except Exception as e:
+            from backend.utils.logger import logger
             logger.error(f"加载托盘图标失败: {e}")
     
-    if image is None:
-        # 如果加载失败或文件不存在，生成一个简单的图标
-        image = Image.new('RGB', (64, 64), color = (73, 109, 137))
+    # 如果加载失败或文件不存在，生成一个简单的图标
+    return Image.new('RGB', (64, 64), color = (73, 109, 137))
+
+def setup_tray():
+    """设置系统托盘"""
+    global tray_icon
+    import pystray
+    
+    # 使用 resource_path 查找图标
+    image = load_tray_icon(resource_path("icon.ico"))
     
     menu = pystray.Menu(
         pystray.MenuItem("打开界面", restore_window, default=True),
@@ -134,6 +134,7 @@ def main():
     global window, server_port
     
     freeze_support()
+    import webview
     
     # 1. 获取端口
     server_port = get_free_port()
@@ -154,19 +155,12 @@ def main():
     t_tray.start()
     
     # 3. 准备 Loading 页面路径
-    if getattr(sys, 'frozen', False):
-        # 打包后，资源在 _internal/frontend 下
-        base_path = os.path.join(sys._MEIPASS, 'frontend')
-    else:
-        # 开发模式
-        base_path = os.path.join(current_dir, 'frontend')
-        
-    loading_file = os.path.join(base_path, 'loading.html')
+    loading_file = os.path.join(FRONTEND_PATH, 'loading.html')
     if not os.path.exists(loading_file):
         # 如果找不到 loading 文件，就先显示一个简单的 html 文本
         loading_url = "data:text/html,<h1>Loading...</h1>"
     else:
-        loading_url = f"file://{os.path.abspath(loading_file)}"
+        loading_url = f"file://{loading_file}"
 
     # 4. 创建窗口
     window = webview.create_window(
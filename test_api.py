@@ -1,23 +1,38 @@
 import http.client
-import json
+import time
 
-def test_api():
+def test_api(paths=("/api/health",), attempts=5):
+    # 所有路径复用同一个连接（HTTP/1.1 默认 keep-alive）
+    # 用 127.0.0.1 而不是 localhost，避免先尝试 IPv6 再回退
+    conn = http.client.HTTPConnection("127.0.0.1", 8888, timeout=1)
+    ok = True
     try:
-        conn = http.client.HTTPConnection("localhost", 8888, timeout=5)
-        conn.request("GET", "/api/health")
-        response = conn.getresponse()
-        
-        print(f"状态码: {response.status}")
-        print(f"状态信息: {response.reason}")
-        
-        data = response.read()
-        print(f"响应内容: {data.decode('utf-8')}")
-        
+        for path in paths:
+            delay = 0.05
+            for attempt in range(attempts):
+                try:
+                    conn.request("GET", path)
+                    response = conn.getresponse()
+                    
+                    print(f"[{path}] 状态码: {response.status}")
+                    print(f"[{path}] 状态信息: {response.reason}")
+                    
+                    # 读完响应体后连接才能发下一个请求
+                    data = response.read()
+                    print(f"[{path}] 响应内容: {data.decode('utf-8')}")
+                    break
+                except (OSError, http.client.HTTPException) as e:
+                    # 同一个连接对象出错后会自动重连，按指数退避重试
+                    conn.close()
+                    if attempt == attempts - 1:
+                        print(f"[{path}] 请求失败: {e}")
+                        ok = False
+                    else:
+                        time.sleep(delay)
+                        delay *= 2
+    finally:
         conn.close()
-        return True
-    except Exception as e:
-        print(f"请求失败: {e}")
-        return False
+    return ok
 
 if __name__ == "__main__":
     print("测试 API 健康检查...")
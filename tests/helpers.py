@@ -0,0 +1,30 @@
+"""
+测试公共工具
+
+导入本模块即为当前进程设置临时加密密钥，避免测试在仓库 data/ 下生成 secret.key。
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from cryptography.fernet import Fernet
+
+os.environ.setdefault('TONGBU_SECRET_KEY', Fernet.generate_key().decode())
+
+from backend.models import database
+from backend.models.database import init_database
+
+
+class TempDatabaseTestCase(unittest.TestCase):
+    """每个用例使用临时目录下独立的 SQLite 数据库（self.tmpdir 在用例结束后删除）"""
+
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp())
+        init_database(f"sqlite:///{(self.tmpdir / 'sync.db').as_posix()}")
+
+    def tearDown(self):
+        database.engine.dispose()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
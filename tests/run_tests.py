@@ -1,22 +1,50 @@
 """
 运行所有单元测试
+
+各测试模块互相独立，按模块分到多个进程并行执行，输出按模块名顺序汇总。
 """
 
+import io
+import os
 import unittest
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import freeze_support
 from pathlib import Path
 
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-if __name__ == '__main__':
-    # 发现并运行所有测试
+START_DIR = Path(__file__).parent
+
+
+def _run_module(file_name: str):
+    """在子进程中运行单个测试模块，返回 (模块文件名, 是否成功, 用例数, 输出)"""
     loader = unittest.TestLoader()
-    start_dir = Path(__file__).parent
-    suite = loader.discover(start_dir, pattern='test_*.py')
-    
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
-    
+    suite = loader.discover(START_DIR, pattern=file_name)
+    stream = io.StringIO()
+    result = unittest.TextTestRunner(stream=stream, verbosity=2).run(suite)
+    return file_name, result.wasSuccessful(), result.testsRun, stream.getvalue()
+
+
+if __name__ == '__main__':
+    freeze_support()
+
+    files = sorted(p.name for p in START_DIR.glob('test_*.py'))
+    failed = []
+    total = 0
+    with ProcessPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1) or 1) as pool:
+        for file_name, ok, tests_run, output in pool.map(_run_module, files):
+            sys.stderr.write(f"===== {file_name} =====\n{output}\n")
+            total += tests_run
+            if not ok:
+                failed.append(file_name)
+
+    sys.stderr.write(f"共 {len(files)} 个模块，{total} 个用例\n")
+    if failed:
+        sys.stderr.write(f"失败模块: {', '.join(failed)}\nFAILED\n")
+    else:
+        sys.stderr.write("OK\n")
+
     # 返回退出码
-    sys.exit(0 if result.wasSuccessful() else 1)
+    sys.exit(1 if failed else 0)
@@ -1,5 +1,6 @@
 import os
 import unittest
+from unittest import mock
 
 from fastapi import FastAPI, Depends
 from fastapi.testclient import TestClient
@@ -8,18 +9,19 @@ from backend.utils.auth import require_api_token
 
 
 class TestApiAuth(unittest.TestCase):
-    def setUp(self):
-        os.environ['TONGBU_API_TOKEN'] = 'test-token'
+    @classmethod
+    def setUpClass(cls):
+        # 整个类共用一个应用与客户端；环境变量在类结束时恢复
+        env = mock.patch.dict(os.environ, {'TONGBU_API_TOKEN': 'test-token'})
+        env.start()
+        cls.addClassCleanup(env.stop)
         app = FastAPI()
 
         @app.get("/protected", dependencies=[Depends(require_api_token)])
         def protected():
             return {"ok": True}
 
-        self.client = TestClient(app)
-
-    def tearDown(self):
-        os.environ.pop('TONGBU_API_TOKEN', None)
+        cls.client = TestClient(app)
 
     def test_requires_token(self):
         res = self.client.get("/protected")
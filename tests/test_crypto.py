@@ -1,6 +1,7 @@
 import unittest
 
-from backend.utils.crypto import encrypt_secret, decrypt_secret
+from tests import helpers  # noqa: F401  导入即设置测试用临时密钥
+from backend.utils.crypto import encrypt_secret, decrypt_secret, _decrypt_token
 
 
 class TestCrypto(unittest.TestCase):
@@ -21,6 +22,16 @@ class TestCrypto(unittest.TestCase):
         raw = "plain"
         self.assertEqual(decrypt_secret(raw), raw)
 
+    def test_decrypt_cached(self):
+        encrypted = encrypt_secret("cached")
+        decrypt_secret(encrypted)
+        hits = _decrypt_token.cache_info().hits
+        self.assertEqual(decrypt_secret(encrypted), "cached")
+        self.assertEqual(_decrypt_token.cache_info().hits, hits + 1)
+
+    def test_decrypt_invalid_token(self):
+        self.assertIsNone(decrypt_secret("enc:not-a-token"))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -14,6 +14,8 @@ from backend.core.eol_normalizer import (
     is_text_file,
     detect_line_ending,
     normalize_line_endings,
+    normalize_bytes,
+    hash_bytes_normalized,
     calculate_file_hash_normalized
 )
 
@@ -21,14 +23,21 @@ from backend.core.eol_normalizer import (
 class TestEOLNormalizer(unittest.TestCase):
     """换行符处理模块测试"""
     
-    def setUp(self):
-        """测试前准备"""
-        self.temp_dir = tempfile.mkdtemp()
+    @classmethod
+    def setUpClass(cls):
+        """整个类共用一个临时根目录"""
+        cls.temp_root = tempfile.mkdtemp()
     
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """测试后清理"""
         import shutil
-        shutil.rmtree(self.temp_dir)
+        shutil.rmtree(cls.temp_root)
+    
+    def setUp(self):
+        """每个用例使用以方法名命名的独立子目录"""
+        self.tmp = Path(self.temp_root) / self._testMethodName
+        self.tmp.mkdir()
     
     def test_is_text_file_by_extension(self):
         """测试通过扩展名识别文本文件"""
@@ -43,19 +52,19 @@ class TestEOLNormalizer(unittest.TestCase):
         }
         
         for filename, expected in test_files.items():
-            filepath = Path(self.temp_dir) / filename
+            filepath = self.tmp / filename
             filepath.write_bytes(b'test content')
             self.assertEqual(is_text_file(filepath), expected, f"文件 {filename} 识别错误")
     
     def test_is_text_file_by_content(self):
         """测试通过内容识别文本文件"""
         # 文本文件（无扩展名）
-        text_file = Path(self.temp_dir) / 'textfile'
+        text_file = self.tmp / 'textfile'
         text_file.write_text('This is text', encoding='utf-8')
         self.assertTrue(is_text_file(text_file))
         
         # 二进制文件（包含 null 字节）
-        binary_file = Path(self.temp_dir) / 'binaryfile'
+        binary_file = self.tmp / 'binaryfile'
         binary_file.write_bytes(b'Binary\x00Content')
         self.assertFalse(is_text_file(binary_file))
     
@@ -69,7 +78,7 @@ class TestEOLNormalizer(unittest.TestCase):
         }
         
         for content, expected in test_cases.items():
-            filepath = Path(self.temp_dir) / f'test_{expected}.txt'
+            filepath = self.tmp / f'test_{expected}.txt'
             filepath.write_bytes(content)
             result = detect_line_ending(filepath)
             self.assertEqual(result, expected, f"换行符检测错误: {content}")
@@ -77,7 +86,7 @@ class TestEOLNormalizer(unittest.TestCase):
     def test_normalize_to_lf(self):
         """测试统一为 LF"""
         # 创建 CRLF 文件
-        test_file = Path(self.temp_dir) / 'test_crlf.txt'
+        test_file = self.tmp / 'test_crlf.txt'
         test_file.write_bytes(b'line1\r\nline2\r\nline3\r\n')
         
         # 统一为 LF
@@ -91,7 +100,7 @@ class TestEOLNormalizer(unittest.TestCase):
     def test_normalize_to_crlf(self):
         """测试统一为 CRLF"""
         # 创建 LF 文件
-        test_file = Path(self.temp_dir) / 'test_lf.txt'
+        test_file = self.tmp / 'test_lf.txt'
         test_file.write_bytes(b'line1\nline2\nline3\n')
         
         # 统一为 CRLF
@@ -104,7 +113,7 @@ class TestEOLNormalizer(unittest.TestCase):
     def test_normalize_mixed_endings(self):
         """测试混合换行符的处理"""
         # 创建混合换行符文件
-        test_file = Path(self.temp_dir) / 'test_mixed.txt'
+        test_file = self.tmp / 'test_mixed.txt'
         test_file.write_bytes(b'line1\r\nline2\nline3\r\n')
         
         # 统一为 LF
@@ -117,7 +126,7 @@ class TestEOLNormalizer(unittest.TestCase):
     def test_normalize_keep_mode(self):
         """测试 keep 模式（不修改）"""
         # 创建 CRLF 文件
-        test_file = Path(self.temp_dir) / 'test_keep.txt'
+        test_file = self.tmp / 'test_keep.txt'
         original_content = b'line1\r\nline2\r\n'
         test_file.write_bytes(original_content)
         
@@ -131,8 +140,8 @@ class TestEOLNormalizer(unittest.TestCase):
     def test_calculate_hash_normalized(self):
         """测试规范化哈希计算"""
         # 创建两个内容相同但换行符不同的文件
-        file_lf = Path(self.temp_dir) / 'test_lf.txt'
-        file_crlf = Path(self.temp_dir) / 'test_crlf.txt'
+        file_lf = self.tmp / 'test_lf.txt'
+        file_crlf = self.tmp / 'test_crlf.txt'
         
         file_lf.write_bytes(b'line1\nline2\nline3\n')
         file_crlf.write_bytes(b'line1\r\nline2\r\nline3\r\n')
@@ -144,11 +153,28 @@ class TestEOLNormalizer(unittest.TestCase):
         # 哈希值应该相同
         self.assertEqual(hash_lf, hash_crlf, "规范化后的哈希值应该相同")
     
+    def test_normalize_and_hash_bytes(self):
+        """测试直接对字节内容规范化与计算哈希"""
+        mixed = b'line1\r\nline2\rline3\n'
+        self.assertEqual(normalize_bytes(mixed, 'lf'), b'line1\nline2\nline3\n')
+        self.assertEqual(normalize_bytes(mixed, 'crlf'), b'line1\r\nline2\r\nline3\r\n')
+        self.assertIs(normalize_bytes(mixed, 'keep'), mixed)
+        
+        self.assertEqual(hash_bytes_normalized(mixed, 'lf'), hash_bytes_normalized(b'line1\nline2\nline3\n', 'lf'))
+        self.assertNotEqual(hash_bytes_normalized(mixed, 'keep'), hash_bytes_normalized(b'line1\nline2\nline3\n', 'keep'))
+        
+        # 与按文件计算的结果一致
+        test_file = self.tmp / 'mixed.txt'
+        test_file.write_bytes(mixed)
+        for mode in ('lf', 'crlf', 'keep'):
+            self.assertEqual(calculate_file_hash_normalized(test_file, eol_mode=mode, hash_algorithm='sha256'),
+                             hash_bytes_normalized(mixed, mode, 'sha256'))
+    
     def test_calculate_hash_keep_mode(self):
         """测试 keep 模式的哈希计算"""
         # 创建两个换行符不同的文件
-        file_lf = Path(self.temp_dir) / 'test_lf.txt'
-        file_crlf = Path(self.temp_dir) / 'test_crlf.txt'
+        file_lf = self.tmp / 'test_lf.txt'
+        file_crlf = self.tmp / 'test_crlf.txt'
         
         file_lf.write_bytes(b'line1\nline2\n')
         file_crlf.write_bytes(b'line1\r\nline2\r\n')
@@ -162,7 +188,7 @@ class TestEOLNormalizer(unittest.TestCase):
     def test_binary_file_not_normalized(self):
         """测试二进制文件不被处理"""
         # 创建二进制文件
-        binary_file = Path(self.temp_dir) / 'test.bin'
+        binary_file = self.tmp / 'test.bin'
         original_content = b'\x00\x01\x02\r\n\x03\x04'
         binary_file.write_bytes(original_content)
         
@@ -2,6 +2,8 @@
 文件工具函数测试
 """
 
+import os
+import tempfile
 import unittest
 from pathlib import Path
 
@@ -10,9 +12,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from backend.utils.file_utils import (
     should_exclude,
+    compile_excluder,
+    make_ext_filter,
     should_include_extension,
-    get_relative_path
+    get_relative_path,
+    get_fs_type,
+    is_network_fs
 )
+from backend.utils.faststat import fast_stat
 
 
 class TestFileUtils(unittest.TestCase):
@@ -52,6 +59,29 @@ class TestFileUtils(unittest.TestCase):
         for path, expected in test_cases.items():
             self.assertEqual(should_exclude(path, patterns), expected, f"路径 {path} 判断错误")
     
+    def test_compiled_excluder_matches_raw_patterns(self):
+        """测试预编译规则与逐条匹配结果一致"""
+        patterns = ['*.pyc', '__pycache__', '.git', '*.tmp', 'build/*', 'test_*.py']
+        excluder = compile_excluder(patterns)
+        paths = [
+            'test.pyc', 'src/__pycache__/test.py', '.git/HEAD', 'temp.tmp', 'build/out.bin',
+            'src/build/out.bin', 'test_main.py', 'main.py', 'src/utils.py', 'a/.gitignore',
+        ]
+        for path in paths:
+            self.assertEqual(should_exclude(path, excluder), should_exclude(path, patterns), f"路径 {path} 判断不一致")
+        self.assertFalse(compile_excluder([])('anything.pyc'))
+    
+    def test_make_ext_filter(self):
+        """测试预编译扩展名过滤与 Path.suffix 语义一致"""
+        ext_filter = make_ext_filter(['.py', '.MD'])
+        self.assertTrue(ext_filter('src/main.py'))
+        self.assertTrue(ext_filter(Path('docs') / 'README.md'))
+        self.assertTrue(ext_filter('A.PY'))
+        self.assertFalse(ext_filter('.py'))
+        self.assertFalse(ext_filter('dir.py/file'))
+        self.assertFalse(ext_filter('main.pyc'))
+        self.assertTrue(make_ext_filter([])('anything.bin'))
+    
     def test_should_include_extension_empty_list(self):
         """测试空扩展名列表（允许所有）"""
         self.assertTrue(should_include_extension('test.py', []))
@@ -74,6 +104,10 @@ class TestFileUtils(unittest.TestCase):
         
         self.assertTrue(should_include_extension('Test.PY', allowed))
         self.assertTrue(should_include_extension('App.JS', allowed))
+        # 白名单本身含大写扩展名时同样按小写比较，与 make_ext_filter 一致
+        self.assertTrue(should_include_extension('notes.txt', ['.TXT']))
+        self.assertTrue(should_include_extension('NOTES.Txt', ['.TXT']))
+        self.assertFalse(should_include_extension('notes.md', ['.TXT']))
     
     def test_get_relative_path(self):
         """测试获取相对路径"""
@@ -88,6 +122,38 @@ class TestFileUtils(unittest.TestCase):
         
         result = get_relative_path(file, base)
         self.assertEqual(result, expected)
+    
+    @unittest.skipIf(sys.platform == 'win32', '依赖 POSIX 路径')
+    def test_get_fs_type_longest_mount_prefix(self):
+        """测试按最长挂载点前缀判断文件系统类型"""
+        mounts = (
+            "/dev/sda1 / ext4 rw,relatime 0 0\n"
+            "server:/export /mnt/nfs nfs4 rw 0 0\n"
+            "//host/share /mnt/my\\040share cifs rw 0 0\n"
+        )
+        with tempfile.NamedTemporaryFile('w', suffix='.mounts', delete=False) as f:
+            f.write(mounts)
+        self.addCleanup(os.remove, f.name)
+        
+        self.assertEqual(get_fs_type('/mnt/nfs/project/a.py', f.name), 'nfs4')
+        self.assertEqual(get_fs_type('/mnt/my share/a.py', f.name), 'cifs')
+        self.assertEqual(get_fs_type('/mnt/nfsx/a.py', f.name), 'ext4')
+        self.assertIsNone(get_fs_type('/tmp', '/nonexistent/mounts'))
+        self.assertTrue(is_network_fs('nfs4'))
+        self.assertTrue(is_network_fs('fuse.sshfs'))
+        self.assertFalse(is_network_fs('ext4'))
+
+    def test_fast_stat_matches_os_stat(self):
+        """测试 fast_stat 与 os.stat 结果一致"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'a.txt'
+            path.write_bytes(b'hello')
+            st = os.stat(path)
+            fst = fast_stat(path)
+            self.assertEqual((fst.mode, fst.size, fst.mtime_ns, fst.ino),
+                             (st.st_mode, st.st_size, st.st_mtime_ns, st.st_ino))
+            with self.assertRaises(FileNotFoundError):
+                fast_stat(Path(tmp) / 'missing')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import unittest
+
+from backend.utils import fastjson
+from backend.utils.realtime import WebSocketHub
+
+
+class FakeWebSocket:
+    def __init__(self, fail=False):
+        self.sent = []
+        self.fail = fail
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        if self.fail:
+            raise RuntimeError("closed")
+        self.sent.append(fastjson.loads(data))
+
+
+class TestWebSocketHub(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.hub = WebSocketHub()
+        self.hub.set_loop(asyncio.get_running_loop())
+
+    async def asyncTearDown(self):
+        self.hub.close()
+
+    @staticmethod
+    def _paths(ws):
+        paths = []
+        for m in ws.sent:
+            logs = m['data'] if m['type'] == 'log_batch' else [m['data']]
+            paths.extend(log['file_path'] for log in logs)
+        return paths
+
+    async def _drain(self):
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    async def test_publish_from_loop_and_other_thread(self):
+        ws = FakeWebSocket()
+        await self.hub.connect_logs(ws)
+
+        # 循环线程内直接入队
+        self.hub.publish_log({'task_id': 1, 'file_path': 'a'})
+        await self._drain()
+        # 其他线程走线程安全投递
+        t = threading.Thread(target=self.hub.publish_log, args=({'task_id': 1, 'file_path': 'b'},))
+        t.start()
+        t.join()
+        await self._drain()
+
+        self.assertEqual(self._paths(ws), ['a', 'b'])
+
+    async def test_task_filter_and_dead_clients(self):
+        task1 = FakeWebSocket()
+        dead = FakeWebSocket(fail=True)
+        status = FakeWebSocket()
+        await self.hub.connect_logs(task1, task_id=1)
+        await self.hub.connect_logs(dead)
+        await self.hub.connect_status(status)
+
+        self.hub.publish_log({'task_id': 2, 'file_path': 'x'})
+        self.hub.publish_log({'task_id': 1, 'file_path': 'y'})
+        self.hub.publish_task_status({'task_id': 1, 'is_running': True})
+        await self._drain()
+
+        self.assertEqual(self._paths(task1), ['y'])
+        self.assertEqual(status.sent, [{'type': 'task_status', 'data': {'task_id': 1, 'is_running': True}}])
+
+        # 发送失败的连接被移除
+        self.hub.publish_log({'task_id': 1, 'file_path': 'z'})
+        await self._drain()
+        self.assertEqual(len(task1.sent), 2)
+        self.assertNotIn(dead, self.hub._log_clients)
+        self.assertNotIn(dead, self.hub._all_logs)
+
+        self.hub.disconnect(task1)
+        self.assertEqual(self.hub._by_task, {})
+
+    async def test_burst_is_sent_as_batches(self):
+        all_logs = FakeWebSocket()
+        task1 = FakeWebSocket()
+        await self.hub.connect_logs(all_logs)
+        await self.hub.connect_logs(task1, task_id=1)
+
+        for i in range(300):
+            self.hub.publish_log({'task_id': 1 if i % 2 else 2, 'file_path': str(i)})
+        await self._drain()
+
+        self.assertEqual(self._paths(all_logs), [str(i) for i in range(300)])
+        self.assertEqual(self._paths(task1), [str(i) for i in range(1, 300, 2)])
+        # 300 条被合并成两批（256 + 44）
+        self.assertEqual([m['type'] for m in all_logs.sent], ['log_batch', 'log_batch'])
+        self.assertEqual(len(all_logs.sent[0]['data']), WebSocketHub.LOG_BATCH_SIZE)
+
+    async def test_slow_client_does_not_block_others(self):
+        release = asyncio.Event()
+
+        class SlowWebSocket(FakeWebSocket):
+            async def send_text(self, data):
+                await release.wait()
+                await super().send_text(data)
+
+        slow = SlowWebSocket()
+        fast = FakeWebSocket()
+        await self.hub.connect_status(slow)
+        await self.hub.connect_status(fast)
+
+        self.hub.publish_task_status({'task_id': 1})
+        await self._drain()
+        self.assertEqual(len(fast.sent), 1)
+        self.assertEqual(slow.sent, [])
+
+        release.set()
+        await self._drain()
+        self.assertEqual(len(slow.sent), 1)
+
+    async def test_disconnect_from_other_thread(self):
+        ws = FakeWebSocket()
+        await self.hub.connect_status(ws)
+        t = threading.Thread(target=self.hub.disconnect, args=(ws,))
+        t.start()
+        t.join()
+        # 连接表只在循环线程内修改
+        self.assertIn(ws, self.hub._status_clients)
+        await self._drain()
+        self.assertNotIn(ws, self.hub._status_clients)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,24 +1,47 @@
+import io
+import os
+import socket
+import stat
+import tarfile
+import tempfile
+import time
 import unittest
+from collections import deque
 from unittest.mock import MagicMock, patch
 
+import paramiko
+from paramiko.sftp import CMD_STATUS
+
+from backend.core.ssh_pool import SSHClientPool, ssh_pool
 from backend.core.transfer import SSHTransfer
 
 
+def _make_transfer(**overrides) -> SSHTransfer:
+    """构造测试用 SSHTransfer：本机地址、固定账号、拒绝未知主机密钥，可按需覆盖参数"""
+    params = dict(host='127.0.0.1', port=22, username='user', password='pass',
+                  host_key_policy='reject', known_hosts_path=None)
+    params.update(overrides)
+    return SSHTransfer(**params)
+
+
+def _mock_sftp():
+    """模拟 SFTPClient：打开的远程文件没有待确认的流水线写请求"""
+    sftp = MagicMock()
+    sftp.open.return_value.__enter__.return_value._reqs = deque()
+    return sftp
+
+
 class TestSSHTransfer(unittest.TestCase):
+    def tearDown(self):
+        ssh_pool.close_all()
+
     @patch('backend.core.transfer.SSHClient')
     def test_reject_policy(self, mock_client):
         client = MagicMock()
         client.open_sftp.return_value = MagicMock()
         mock_client.return_value = client
 
-        transfer = SSHTransfer(
-            host='127.0.0.1',
-            port=22,
-            username='user',
-            password='pass',
-            host_key_policy='reject',
-            known_hosts_path=None
-        )
+        transfer = _make_transfer()
         transfer.connect()
 
         args, _ = client.set_missing_host_key_policy.call_args
@@ -30,18 +53,333 @@ class TestSSHTransfer(unittest.TestCase):
         client.open_sftp.return_value = MagicMock()
         mock_client.return_value = client
 
-        transfer = SSHTransfer(
-            host='127.0.0.1',
-            port=22,
-            username='user',
-            password='pass',
-            host_key_policy='auto',
-            known_hosts_path='./tests/data/known_hosts'
-        )
+        transfer = _make_transfer(host_key_policy='auto', known_hosts_path='./tests/data/known_hosts')
         transfer.connect()
 
         client.save_host_keys.assert_called()
 
+    @patch('backend.core.transfer.SSHClient')
+    def test_sftp_channel_pool(self, mock_client):
+        client = MagicMock()
+        client.open_sftp.side_effect = _mock_sftp
+        mock_client.return_value = client
+
+        transfer = _make_transfer()
+        transfer.connect()
+        transfer.open_sftp_pool(2)
+        # 按 1+2 个通道重新占用连接：新主通道 + 2 个池通道，旧主通道关闭
+        self.assertEqual(client.open_sftp.call_count, 4)
+        self.assertEqual(client.close.call_count, 0)
+
+        # 同时借出的通道互不相同，且不占用主通道
+        with transfer.sftp_channel() as a, transfer.sftp_channel() as b:
+            self.assertIsNot(a, b)
+            self.assertIsNot(a, transfer.sftp)
+            self.assertIsNot(b, transfer.sftp)
+
+        transfer.sftp.stat.return_value.st_mode = stat.S_IFDIR | 0o755
+        transfer.upload_file(io.BytesIO(b'data'), '/remote/a.txt')
+        pooled = list(transfer._channel_pool.queue)
+        self.assertTrue(any(ch.open.called for ch in pooled))
+        transfer.sftp.open.assert_not_called()
+
+        # 重连后通道池自动恢复
+        transfer.close()
+        transfer.connect()
+        self.assertEqual(transfer._channel_pool.qsize(), 2)
+
+    @patch('backend.core.transfer.SSHClient')
+    def test_connection_shared_via_pool(self, mock_client):
+        client = MagicMock()
+        client.open_sftp.side_effect = lambda: MagicMock()
+        mock_client.return_value = client
+
+        first, second = _make_transfer(), _make_transfer()
+        first.connect()
+        second.connect()
+
+        # 同参数共用一条 SSH 连接，各自独立的 SFTP 通道
+        self.assertEqual(mock_client.call_count, 1)
+        self.assertIs(first.ssh, second.ssh)
+        self.assertIsNot(first.sftp, second.sftp)
+
+        first.close()
+        client.close.assert_not_called()
+        second.close()
+        client.close.assert_called_once()
+
+    def test_pool_discard_keeps_healthy_shared_client(self):
+        pool = SSHClientPool()
+        client = MagicMock()
+        client.get_transport.return_value.is_active.return_value = True
+        self.assertIs(pool.acquire('k', lambda: client), client)
+        self.assertIs(pool.acquire('k', lambda: MagicMock()), client)
+
+        # 某个调用方打开通道失败，但连接本身健康：只减引用，不断开其他调用方
+        pool.release('k', client, discard=True)
+        client.close.assert_not_called()
+        self.assertIs(pool.acquire('k', lambda: MagicMock()), client)
+
+        # 连接确已断开时才移出并关闭
+        client.get_transport.return_value.is_active.return_value = False
+        pool.release('k', client, discard=True)
+        client.close.assert_called_once()
+
+    def test_pool_opens_second_client_when_channels_full(self):
+        pool = SSHClientPool()
+        clients = []
+
+        def factory():
+            clients.append(MagicMock())
+            return clients[-1]
+
+        # 每条连接最多 8 个 SFTP 通道，剩余会话留给 exec 命令
+        first = pool.acquire('k', factory, channels=4)
+        second = pool.acquire('k', factory, channels=4)
+        third = pool.acquire('k', factory, channels=4)
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(len(clients), 2)
+
+        # 归还后腾出的通道额度可再次复用
+        pool.release('k', first, channels=4)
+        self.assertIs(pool.acquire('k', factory, channels=3), first)
+        self.assertEqual(len(clients), 2)
+
+    def test_shell_probe_not_cached_on_error(self):
+        transfer = _make_transfer()
+        # 会话数已满等执行失败：本次按不支持处理，但下次重新探测
+        transfer._run_command = MagicMock(side_effect=paramiko.ChannelException(1, 'open failed'))
+        self.assertFalse(transfer.has_posix_shell())
+        self.assertFalse(transfer.has_remote_tar())
+        transfer._run_command = MagicMock(return_value=(0, '', ''))
+        self.assertTrue(transfer.has_posix_shell())
+        self.assertTrue(transfer.has_remote_tar())
+
+    def test_pipelined_write_chunks(self):
+        transfer = _make_transfer(block_size=4)
+        sftp = MagicMock()
+        remote = sftp.open.return_value.__enter__.return_value
+        remote._reqs = deque([1, 2, 3])
+        sftp._read_response.return_value = (CMD_STATUS, None)
+
+        written = transfer._pipelined_write(sftp, io.BytesIO(b'0123456789'), '/remote/a.bin')
+
+        self.assertEqual(written, 10)
+        remote.set_pipelined.assert_called_once_with(True)
+        self.assertEqual(remote.MAX_REQUEST_SIZE, 4)
+        self.assertEqual([c.args[0] for c in remote.write.call_args_list], [b'0123', b'4567', b'89'])
+        # 关闭前按顺序确认全部写请求，无需写后 stat
+        self.assertEqual([c.args[0] for c in sftp._read_response.call_args_list], [1, 2, 3])
+        sftp.stat.assert_not_called()
+
+    def test_pipelined_write_raises_on_failed_write(self):
+        transfer = _make_transfer(block_size=4)
+        sftp = MagicMock()
+        remote = sftp.open.return_value.__enter__.return_value
+        remote._reqs = deque([1, 2])
+        # 末尾写请求失败（如磁盘已满）必须抛出，而不是留下被截断的文件
+        sftp._read_response.side_effect = [(CMD_STATUS, None), IOError('No space left on device')]
+
+        with self.assertRaises(IOError):
+            transfer._pipelined_write(sftp, io.BytesIO(b'01234567'), '/remote/a.bin')
+
+    def test_attr_cache_reused_and_invalidated(self):
+        transfer = _make_transfer()
+        transfer.ensure_connected = MagicMock()
+        transfer.sftp = MagicMock()
+
+        def make_attr(name, mode):
+            attr = paramiko.SFTPAttributes()
+            attr.filename = name
+            attr.st_mode = mode
+            attr.st_size = 3
+            return attr
+
+        transfer.sftp.listdir_attr.side_effect = lambda path: {
+            '/remote': [make_attr('a.txt', stat.S_IFREG | 0o644), make_attr('sub', stat.S_IFDIR | 0o755)],
+            '/remote/sub': [make_attr('b.txt', stat.S_IFREG | 0o644)],
+        }[path]
+
+        rel_paths = sorted(rel for rel, _ in transfer.iter_files('/remote/'))
+        self.assertEqual(rel_paths, ['a.txt', 'sub/b.txt'])
+
+        # 遍历拿到的属性直接复用，不再逐个 stat
+        self.assertEqual(transfer.stat('/remote/a.txt').st_size, 3)
+        self.assertTrue(transfer.exists('/remote/sub/b.txt'))
+        self.assertTrue(transfer.is_dir('/remote/sub/'))
+        transfer.sftp.stat.assert_not_called()
+
+        transfer.delete_file('/remote/a.txt')
+        transfer.sftp.stat.side_effect = FileNotFoundError
+        self.assertFalse(transfer.exists('/remote/a.txt'))
+        transfer.sftp.stat.assert_called_once_with('/remote/a.txt')
+
+        # 过期后回源
+        with patch('backend.core.transfer.time.monotonic', return_value=time.monotonic() + 10):
+            self.assertFalse(transfer.exists('/remote/sub/b.txt'))
+
+    def test_attr_cache_prunes_expired_on_insert(self):
+        transfer = _make_transfer()
+        for i in range(100):
+            transfer._cache_attr(f'/remote/old{i}', paramiko.SFTPAttributes())
+        transfer._cache_attr('/remote/old0', paramiko.SFTPAttributes())
+
+        # 之后的插入会清掉过期条目，已删除的路径不会一直留在缓存里
+        with patch('backend.core.transfer.time.monotonic', return_value=time.monotonic() + 10):
+            transfer._cache_attr('/remote/new', paramiko.SFTPAttributes())
+        self.assertEqual(list(transfer._attr_cache), ['/remote/new'])
+
+    def test_upload_after_mkdir_skips_dir_stat(self):
+        transfer = _make_transfer()
+        transfer.ensure_connected = MagicMock()
+        transfer.sftp = _mock_sftp()
+        transfer._remote_posix = True
+        transfer._run_command = MagicMock(return_value=(0, '', ''))
+
+        transfer.mkdir_many(['/r/a', '/r/b'])
+        transfer.upload_file(io.BytesIO(b'x'), '/r/a/f.txt')
+        transfer.write_file_bytes('/r/b/g.txt', b'y')
+
+        transfer.sftp.stat.assert_not_called()
+
+        # 目标目录位置是普通文件：一次 stat 即报错
+        transfer.sftp.stat.return_value.st_mode = stat.S_IFREG | 0o644
+        with self.assertRaises(FileExistsError):
+            transfer.upload_file(io.BytesIO(b'x'), '/r/file/f.txt')
+        transfer.sftp.stat.assert_called_once_with('/r/file')
+
+    def test_mkdir_many_single_command(self):
+        transfer = _make_transfer()
+        transfer.ensure_connected = MagicMock()
+        transfer.sftp = MagicMock()
+        transfer._run_command = MagicMock(return_value=(0, '', ''))
+
+        transfer.mkdir_many(['/r/b c', '/r/a', '/', '/r/a'])
+
+        commands = [c.args[0] for c in transfer._run_command.call_args_list]
+        self.assertEqual(commands, [
+            'command -v mkdir >/dev/null 2>&1',
+            "mkdir -p -- /r/a '/r/b c'",
+        ])
+        transfer.sftp.mkdir.assert_not_called()
+
+        # 命令失败时回退到逐级 SFTP 创建
+        transfer._run_command.return_value = (1, '', 'File exists')
+        transfer.sftp.stat.side_effect = FileNotFoundError
+        transfer.mkdir_p('/x/y')
+        self.assertEqual([c.args[0] for c in transfer.sftp.mkdir.call_args_list], ['/x', '/x/y'])
+
+    def test_iter_files_fast_parses_find_output(self):
+        transfer = _make_transfer()
+        transfer.ensure_connected = MagicMock()
+        transfer._remote_posix = True
+        transfer.ssh = MagicMock()
+        transfer.sftp = MagicMock()
+        output = b'f\t644\t3\t1700000000.5\ta.txt\0f\t600\t5\t1700000001.0\tsub/b c.txt\0'
+        stdout = MagicMock()
+        # 模拟分块到达，记录跨块
+        stdout.read.side_effect = [output[:20], output[20:], b'']
+        stdout.channel.recv_exit_status.return_value = 0
+        transfer.ssh.exec_command.return_value = (MagicMock(), stdout, MagicMock())
+
+        items = {rel: (attr.st_size, attr.st_mtime, attr.st_mode) for rel, attr in transfer.iter_files_fast('/remote')}
+
+        self.assertEqual(items, {
+            'a.txt': (3, 1700000000, stat.S_IFREG | 0o644),
+            'sub/b c.txt': (5, 1700000001, stat.S_IFREG | 0o600),
+        })
+        self.assertEqual(transfer.ssh.exec_command.call_count, 1)
+        self.assertEqual(transfer.stat('/remote/sub/b c.txt').st_size, 5)
+        transfer.sftp.listdir_attr.assert_not_called()
+        transfer.sftp.stat.assert_not_called()
+
+        # find 不可用（无输出且失败）时回退到逐目录遍历
+        stdout.read.side_effect = [b'']
+        stdout.channel.recv_exit_status.return_value = 1
+        transfer.sftp.listdir_attr.return_value = []
+        self.assertEqual(list(transfer.iter_files_fast('/remote')), [])
+        transfer.sftp.listdir_attr.assert_called_once_with('/remote')
+
+        # 读到一半超时：丢弃已解析的部分结果，整棵树改用逐目录遍历
+        transfer.sftp.listdir_attr.reset_mock()
+        listed = paramiko.SFTPAttributes()
+        listed.filename = 'z.txt'
+        listed.st_mode = stat.S_IFREG | 0o644
+        transfer.sftp.listdir_attr.return_value = [listed]
+        stdout.read.side_effect = [output[:40], socket.timeout()]
+        self.assertEqual([rel for rel, _ in transfer.iter_files_fast('/remote')], ['z.txt'])
+        transfer.sftp.listdir_attr.assert_called_once_with('/remote')
+
+    def test_remove_dir_recursive_uses_rm_with_guard(self):
+        transfer = _make_transfer()
+        transfer.ensure_connected = MagicMock()
+        transfer.sftp = MagicMock()
+        transfer._remote_posix = True
+        transfer._run_command = MagicMock(return_value=(0, '', ''))
+
+        for path in ('/', '/home', 'home/', '/home/../..', '/a/./'):
+            with self.assertRaises(ValueError):
+                transfer.remove_dir_recursive(path)
+        transfer._run_command.assert_not_called()
+
+        transfer.remove_dir_recursive('/data/.trash/20240101_000000')
+        transfer._run_command.assert_called_once_with("rm -rf -- /data/.trash/20240101_000000", timeout=300)
+        transfer.sftp.listdir_attr.assert_not_called()
+
+        # rm 失败时回退到 SFTP 逐项删除
+        transfer._run_command.return_value = (1, '', 'Permission denied')
+        transfer.sftp.listdir_attr.return_value = []
+        transfer.remove_dir_recursive('/data/.trash/old')
+        transfer.sftp.rmdir.assert_called_once_with('/data/.trash/old')
+
+    def test_download_large_truncates_when_remote_shrinks(self):
+        transfer = _make_transfer()
+        transfer.DOWNLOAD_WRITE_SIZE = 4
+        remote = io.BytesIO(b'0123456789')
+        with tempfile.TemporaryDirectory() as tmp:
+            local = os.path.join(tmp, 'out.bin')
+            # stat 时 16 字节，实际只读到 10 字节
+            transfer._download_large(remote, 16, local)
+            with open(local, 'rb') as f:
+                self.assertEqual(f.read(), b'0123456789')
+
+    def test_bulk_upload_streams_tar(self):
+        transfer = _make_transfer()
+        transfer.ensure_connected = MagicMock()
+        transfer.ssh = MagicMock()
+
+        class _Stdin(io.BytesIO):
+            def close(self):
+                self.captured = self.getvalue()
+                super().close()
+
+        stdin = _Stdin()
+        stdout = MagicMock()
+        stdout.channel.recv_exit_status.return_value = 0
+        transfer.ssh.exec_command.return_value = (stdin, stdout, MagicMock())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            a = os.path.join(tmp, 'a.txt')
+            b = os.path.join(tmp, 'b.bin')
+            with open(a, 'wb') as f:
+                f.write(b'x\r\n')
+            with open(b, 'wb') as f:
+                f.write(b'\x00\x01')
+            count = transfer.bulk_upload(
+                "/remote/my root",
+                [('a.txt', a), ('sub\\b.bin', b)],
+                content_fn=lambda p: b'x\n' if p.endswith('.txt') else None
+            )
+
+        self.assertEqual(count, 2)
+        command = transfer.ssh.exec_command.call_args.args[0]
+        self.assertEqual(command, "mkdir -p -- '/remote/my root' && tar -xf - -C '/remote/my root'")
+        with tarfile.open(fileobj=io.BytesIO(stdin.captured), mode='r:') as tar:
+            self.assertEqual(tar.getnames(), ['a.txt', 'sub/b.bin'])
+            self.assertEqual(tar.extractfile('a.txt').read(), b'x\n')
+            self.assertEqual(tar.extractfile('sub/b.bin').read(), b'\x00\x01')
+
 
 if __name__ == '__main__':
     unittest.main()
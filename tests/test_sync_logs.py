@@ -0,0 +1,37 @@
+import unittest
+from datetime import datetime, timedelta
+
+from tests.helpers import TempDatabaseTestCase
+from backend.models.database import get_db
+from backend.models.sync_task import SyncLog, get_logs, get_logs_after
+
+
+class TestLogPagination(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        base = datetime(2024, 1, 1)
+        with get_db() as db:
+            for i in range(25):
+                # 每两条同一时间，验证同时间戳按 id 继续翻页
+                db.add(SyncLog(task_id=1 if i % 5 else 2, event_type='modified', file_path=f'f{i}',
+                               status='success', sync_time=base + timedelta(seconds=i // 2)))
+
+    def test_keyset_pages_match_offset_pages(self):
+        with get_db() as db:
+            expected = [log.id for log in get_logs(db, task_id=1, limit=100)]
+            pages = []
+            cursor = None
+            while True:
+                page = get_logs_after(db, task_id=1, cursor=cursor, limit=3)
+                if not page:
+                    break
+                pages.extend(log.id for log in page)
+                cursor = (page[-1].sync_time, page[-1].id)
+
+        self.assertEqual(len(pages), 20)
+        self.assertEqual(len(set(pages)), 20)
+        self.assertEqual(set(pages), set(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
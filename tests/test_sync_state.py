@@ -0,0 +1,73 @@
+import unittest
+from datetime import datetime
+
+from sqlalchemy import inspect
+
+from tests.helpers import TempDatabaseTestCase
+from backend.utils import fastjson
+from backend.models.database import get_db
+from backend.models.sync_state import (
+    bulk_upsert_file_states,
+    get_all_file_states,
+    get_endpoints,
+    replace_endpoints,
+    upsert_file_state,
+)
+
+
+class TestSyncState(TempDatabaseTestCase):
+    def test_bulk_upsert_inserts_then_updates(self):
+        now = datetime.now()
+        rows = [
+            {'rel_path': f'dir/file{i}.txt', 'a_meta': {'size': i}, 'b_meta': {}, 'a_deleted': False,
+             'b_deleted': True, 'a_seen_at': now, 'b_seen_at': None, 'last_winner': None, 'last_sync_at': None}
+            for i in range(300)
+        ]
+        with get_db() as db:
+            self.assertEqual(bulk_upsert_file_states(db, 1, rows), 300)
+
+        rows[0] = dict(rows[0], b_meta={'size': 0}, b_deleted=False, last_winner='a', last_sync_at=now)
+        with get_db() as db:
+            bulk_upsert_file_states(db, 1, rows[:1])
+            bulk_upsert_file_states(db, 2, rows[:1])
+
+        with get_db() as db:
+            states = get_all_file_states(db, 1)
+            self.assertEqual(len(states), 300)
+            first = states['dir/file0.txt']
+            self.assertEqual(first.b_meta, {'size': 0})
+            self.assertFalse(first.b_deleted)
+            self.assertEqual(first.last_winner, 'a')
+            self.assertEqual(states['dir/file299.txt'].a_meta, {'size': 299})
+            self.assertEqual(len(get_all_file_states(db, 2)), 1)
+
+    def test_upsert_file_state_returns_loaded_row(self):
+        with get_db() as db:
+            state = upsert_file_state(db, 1, 'a.txt', {'a_meta': {'size': 1}, 'last_winner': 'a'})
+            # 提交后已刷新：返回的对象属性均已加载，读取时不会再触发查询
+            self.assertFalse(inspect(state).expired_attributes)
+            self.assertEqual(state.a_meta, {'size': 1})
+            self.assertEqual(state.last_winner, 'a')
+
+    def test_replace_endpoints(self):
+        with get_db() as db:
+            replace_endpoints(db, 1, {
+                'a': {'type': 'local', 'path': '/a'},
+                'b': {'type': 'ssh', 'path': '/b', 'host': 'h', 'password': 'secret'},
+            })
+        with get_db() as db:
+            # 密码只以密文落库
+            self.assertTrue(get_endpoints(db, 1)['b'].password.startswith('enc:'))
+        with get_db() as db:
+            replace_endpoints(db, 1, {'a': {'type': 'local', 'path': '/a2'}})
+            endpoints = get_endpoints(db, 1)
+            self.assertEqual(list(endpoints), ['a'])
+            self.assertEqual(endpoints['a'].path, '/a2')
+
+    def test_fastjson_fallback_for_non_str_keys(self):
+        self.assertEqual(fastjson.loads(fastjson.dumps({'a': [1, 2.5, None], '名': True})), {'a': [1, 2.5, None], '名': True})
+        self.assertEqual(fastjson.loads(fastjson.dumps({1: 'x'})), {'1': 'x'})
+
+
+if __name__ == '__main__':
+    unittest.main()
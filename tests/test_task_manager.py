@@ -0,0 +1,101 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from tests.helpers import TempDatabaseTestCase
+from backend.models.database import get_db
+from backend.models.sync_task import create_task, update_task
+from backend.core.task_manager import TaskManager
+
+
+class TestTaskMetaCache(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        with get_db() as db:
+            task = create_task(db, {
+                'name': 'meta-cache',
+                'source_path': str(self.tmpdir / 'src'),
+                'target_type': 'local',
+                'target_path': str(self.tmpdir / 'dst'),
+                'enabled': True,
+                'auto_start': False,
+                'eol_normalize': 'keep',
+                'exclude_patterns': ['*.tmp'],
+                'file_extensions': []
+            })
+            self.task_id = task.id
+        self.manager = TaskManager()
+
+    def test_meta_cached_until_invalidate(self):
+        task, settings, endpoints = self.manager._get_task_meta(self.task_id)
+        self.assertEqual(task.name, 'meta-cache')
+        self.assertEqual(task.exclude_patterns, ['*.tmp'])
+        self.assertIsNone(settings)
+        self.assertIsNone(endpoints)
+
+        with get_db() as db:
+            update_task(db, self.task_id, {'name': 'renamed'})
+
+        # 未失效前读缓存快照（Session 关闭后仍可访问）
+        task, _, _ = self.manager._get_task_meta(self.task_id)
+        self.assertEqual(task.name, 'meta-cache')
+
+        self.manager.invalidate(self.task_id)
+        task, _, _ = self.manager._get_task_meta(self.task_id)
+        self.assertEqual(task.name, 'renamed')
+
+    def test_missing_task_raises(self):
+        with self.assertRaises(ValueError):
+            self.manager._get_task_meta(self.task_id + 1000)
+
+
+class TestSharedExecutor(unittest.TestCase):
+    def test_executor_shared_and_shut_down(self):
+        manager = TaskManager()
+        executor = manager.sync_executor()
+        self.assertIs(manager.sync_executor(), executor)
+        self.assertEqual(executor._max_workers, TaskManager.SYNC_WORKERS)
+
+        manager.stop_all()
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)
+        # 再次使用时重新创建
+        self.assertIsNot(manager.sync_executor(), executor)
+        manager.stop_all()
+
+
+class TestStatusCoalescing(unittest.TestCase):
+    def test_status_updates_merged_per_task(self):
+        manager = TaskManager()
+        self.addCleanup(manager.stop_all)
+        flushed = threading.Event()
+        with patch('backend.core.task_manager.ws_hub') as hub:
+            def on_publish(_):
+                # 两个任务的状态在同一次 flush 中推送，收到第二条即完成
+                if hub.publish_task_status.call_count >= 2:
+                    flushed.set()
+
+            hub.publish_task_status.side_effect = on_publish
+            manager._queue_status({'task_id': 1, 'name': 't1', 'is_running': True})
+            manager._queue_status({'task_id': 1, 'is_running': False})
+            manager._queue_status({'task_id': 2, 'is_running': True})
+            self.assertTrue(flushed.wait(timeout=2))
+
+        payloads = sorted((c.args[0] for c in hub.publish_task_status.call_args_list), key=lambda d: d['task_id'])
+        self.assertEqual(payloads, [
+            {'task_id': 1, 'name': 't1', 'is_running': False},
+            {'task_id': 2, 'is_running': True},
+        ])
+
+    def test_stop_all_flushes_pending_status(self):
+        manager = TaskManager()
+        manager._status_delay = 60
+        with patch('backend.core.task_manager.ws_hub') as hub:
+            manager._queue_status({'task_id': 1, 'is_running': False})
+            manager.stop_all()
+        hub.publish_task_status.assert_called_once_with({'task_id': 1, 'is_running': False})
+        self.assertEqual(manager._pending_status, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
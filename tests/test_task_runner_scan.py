@@ -1,9 +1,14 @@
+import os
 import shutil
+import threading
 import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from unittest.mock import patch
 
-from backend.core.task_manager import TaskRunner
+from backend.config.settings import AppConfig, GlobalConfig
+from backend.core.task_manager import TaskManager, TaskRunner
 from backend.models.sync_task import SyncTask
 
 
@@ -44,11 +49,157 @@ class TestTaskRunnerScan(unittest.TestCase):
         runner._scan_once()
         self.assertTrue((self.target / "a.txt").exists())
 
-        time.sleep(0.01)
+        st = p.stat()
         p.write_text("v2", encoding="utf-8")
+        # 同大小、mtime 仅推进 10ms：纳秒粒度文件系统上也必须识别为修改
+        os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
         runner._scan_once()
         self.assertEqual((self.target / "a.txt").read_text(encoding="utf-8"), "v2")
 
+    def test_scan_ignores_same_size_touch_within_tolerance(self):
+        runner = TaskRunner(self.task)
+        runner._create_sync_engine()
+
+        p = self.source / "a.txt"
+        p.write_text("v1", encoding="utf-8")
+        runner._scan_once()
+
+        # 模拟粗粒度文件系统：mtime 为整秒
+        st = p.stat()
+        base_ns = st.st_mtime_ns - st.st_mtime_ns % 1_000_000_000
+        os.utime(p, ns=(st.st_atime_ns, base_ns))
+        runner._scan_once()
+
+        # 同大小同 inode、整秒 mtime 仅差 1s：视为同一版本，不应重传
+        os.utime(p, ns=(st.st_atime_ns, base_ns + 1_000_000_000))
+        (self.target / "a.txt").write_text("xx", encoding="utf-8")
+        runner._scan_once()
+        self.assertEqual((self.target / "a.txt").read_text(encoding="utf-8"), "xx")
+
+        # 非整秒 mtime 说明文件系统精度足够，任何变化都视为修改
+        os.utime(p, ns=(st.st_atime_ns, base_ns + 1_500_000_000))
+        runner._scan_once()
+        self.assertEqual((self.target / "a.txt").read_text(encoding="utf-8"), "v1")
+
+    def test_batch_queue_dedup_keeps_latest(self):
+        runner = TaskRunner(self.task)
+        runner.sync_engine = object()  # 仅需非空，入队不会真正同步
+
+        a = str(self.source / "a.txt")
+        b = str(self.source / "b.txt")
+        runner._on_file_change("created", a, "")
+        runner._on_file_change("created", b, "")
+        runner._on_file_change("modified", a, "")
+
+        events = list(runner._batch_queue.values())
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0][:2], ("modified", "a.txt"))
+        self.assertEqual(events[1][:2], ("created", "b.txt"))
+
+    def test_scan_applies_precompiled_filters(self):
+        self.task.exclude_patterns = ["*.tmp", "node_modules"]
+        self.task.file_extensions = [".TXT"]
+        runner = TaskRunner(self.task)
+        runner._create_sync_engine()
+
+        (self.source / "node_modules").mkdir()
+        (self.source / "node_modules" / "x.txt").write_text("x", encoding="utf-8")
+        (self.source / "a.tmp").write_text("x", encoding="utf-8")
+        (self.source / "b.py").write_text("x", encoding="utf-8")
+        (self.source / "c.txt").write_text("x", encoding="utf-8")
+        runner._scan_once()
+
+        self.assertEqual(sorted(runner._last_mtimes), ["c.txt"])
+
+    def test_same_path_synced_serially(self):
+        runner = TaskRunner(self.task)
+        active = []
+        overlap = []
+
+        class _Engine:
+            def sync_file(self, event_type, rel_path, src_path, dest_path):
+                active.append(rel_path)
+                overlap.append(active.count(rel_path))
+                time.sleep(0.02)
+                active.remove(rel_path)
+                return True
+
+        runner.sync_engine = _Engine()
+        src = str(self.source / "a.txt")
+        # 兜底扫描与批量同步线程同时处理同一路径
+        threads = [threading.Thread(target=runner._sync_path, args=(ev, "a.txt", src))
+                   for ev in ("modified", "deleted", "modified")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(overlap, [1, 1, 1])
+
+    def _start_dispatch(self, runner):
+        """为 runner 接上真实的共享事件循环与线程池，并用桩引擎记录同步调用"""
+        manager = TaskManager()
+        calls = []
+        done = threading.Event()
+
+        class _Engine:
+            def sync_file(self, event_type, rel_path, src_path, dest_path):
+                calls.append((event_type, rel_path))
+                done.set()
+                return True
+
+        runner.sync_engine = _Engine()
+        runner._loop = manager.dispatch_loop()
+        runner._executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(manager.stop_all)
+        self.addCleanup(runner._executor.shutdown)
+        return calls, done
+
+    def test_batch_flush_via_event_loop(self):
+        runner = TaskRunner(self.task)
+        calls, done = self._start_dispatch(runner)
+
+        runner._on_file_change("created", str(self.source / "a.txt"), "")
+        runner._on_file_change("created", str(self.source / "b.txt"), "")
+        runner._on_file_change("modified", str(self.source / "a.txt"), "")
+
+        deadline = time.monotonic() + 2
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(sorted(calls), [("created", "b.txt"), ("modified", "a.txt")])
+
+    def test_rate_limit_defers_hot_path(self):
+        runner = TaskRunner(self.task)
+        calls, done = self._start_dispatch(runner)
+        runner._min_interval_seconds = 0.2
+
+        a = str(self.source / "a.txt")
+        runner._last_sync_ts["a.txt"] = time.monotonic()
+        runner._on_file_change("modified", a, "")
+        runner._on_file_change("modified", a, "")
+        self.assertEqual(len(runner._batch_queue), 0)
+        self.assertEqual(list(runner._deferred.keys()), ["a.txt"])
+
+        self.assertTrue(done.wait(timeout=2))
+        self.assertEqual(calls, [("modified", "a.txt")])
+        self.assertEqual(len(runner._deferred), 0)
+
+    def test_min_interval_from_config(self):
+        config = AppConfig(global_=GlobalConfig(sync_min_interval=0.25))
+        with patch('backend.core.task_manager.load_config', return_value=config):
+            self.assertEqual(TaskRunner(self.task)._min_interval_seconds, 0.25)
+        # 配置读取失败时退回默认值
+        with patch('backend.core.task_manager.load_config', side_effect=ValueError('bad yaml')):
+            self.assertEqual(TaskRunner(self.task)._min_interval_seconds, 1.0)
+
+    def test_prune_drops_expired_sync_ts(self):
+        runner = TaskRunner(self.task)
+        runner._min_interval_seconds = 5
+        now = time.monotonic()
+        runner._last_sync_ts.update({"old.txt": now - 10, "hot.txt": now})
+        with runner._batch_lock:
+            runner._prune_sync_ts()
+        self.assertEqual(list(runner._last_sync_ts.keys()), ["hot.txt"])
+
 
 if __name__ == "__main__":
     unittest.main()